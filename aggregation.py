@@ -0,0 +1,132 @@
+"""
+This file handles grouping a global mean sea level series into calendar bins.
+
+The samples of a series are assigned an integer bin number (a month, season, year or decade) and
+every statistic is computed for all bins at once with a single NumPy reduction over the sorted
+bin boundaries, instead of collecting the values of each bin in a Python list.
+
+The reduction adds the values of a bin in a different order than a Python loop, so the sums can
+differ in their last bit. When the result is rounded afterwards, that only matters for values
+within a rounding error of a tie, so if the number of decimals is given, the bins whose result is
+that close to a tie are added again one value after the other, like sum() does.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+from sea_level_series import SeaLevelSeries, near_ties
+
+LEVELS = ('month', 'season', 'year', 'decade')
+STATISTICS = ('mean', 'min', 'max', 'count', 'sum')
+
+
+def aggregate(series: SeaLevelSeries, level: str = 'year', statistic: str = 'mean',
+              decimals: Optional[int] = None) -> SeaLevelSeries:
+    """Return a series with one value per bin of the given level, computed with the given
+    statistic over the samples of series that fall in that bin.
+
+    The timestamp of every bin is the time it starts at:
+        - 'month': year + month / 12, where January is month 0
+        - 'season': the start of the meteorological season, so winter (December, January and
+          February) of 1994 starts at 1993 + 11 / 12
+        - 'year': the whole year
+        - 'decade': the first year of the decade, e.g. 1990
+
+    Empty bins are left out.
+
+    If decimals is given, the sums and means are the same as adding the values of every bin in
+    order, as the original dictionary implementation did, wherever that changes their value
+    rounded to that many decimals.
+
+    Preconditions:
+        - level in LEVELS
+        - statistic in STATISTICS
+    """
+    if level not in LEVELS:
+        raise ValueError(f'unknown aggregation level {level!r}, expected one of {LEVELS}')
+    if statistic not in STATISTICS:
+        raise ValueError(f'unknown statistic {statistic!r}, expected one of {STATISTICS}')
+
+    bins = bin_numbers(series.times, level)
+    values = series.values
+    if len(bins) > 1 and np.any(bins[1:] < bins[:-1]):
+        order = np.argsort(bins, kind='stable')
+        bins, values = bins[order], values[order]
+
+    labels, starts, counts = _boundaries(bins)
+    if len(labels) == 0:
+        result = np.empty(0)
+    elif statistic == 'count':
+        result = counts.astype(np.float64)
+    elif statistic == 'min':
+        result = np.minimum.reduceat(values, starts)
+    elif statistic == 'max':
+        result = np.maximum.reduceat(values, starts)
+    else:
+        result = np.add.reduceat(values, starts)
+        if statistic == 'mean':
+            result = result / counts
+        if decimals is not None:
+            _add_near_ties_in_order(result, values, starts, counts, statistic, decimals)
+
+    return SeaLevelSeries(bin_start_times(labels, level), result)
+
+
+def bin_numbers(times: np.ndarray, level: str) -> np.ndarray:
+    """Return the int64 bin number of every timestamp for the given aggregation level."""
+    if level == 'month':
+        return np.floor(times * 12).astype(np.int64)
+    elif level == 'season':
+        return np.floor((times + 1 / 12) * 4).astype(np.int64)
+    elif level == 'year':
+        return np.floor(times).astype(np.int64)
+    else:
+        return np.floor(times / 10).astype(np.int64)
+
+
+def bin_start_times(bins: np.ndarray, level: str) -> np.ndarray:
+    """Return the time every bin number of the given aggregation level starts at."""
+    if level == 'month':
+        return bins / 12
+    elif level == 'season':
+        return bins / 4 - 1 / 12
+    elif level == 'year':
+        return bins.astype(np.float64)
+    else:
+        return bins * 10.0
+
+
+def _add_near_ties_in_order(result: np.ndarray, values: np.ndarray, starts: np.ndarray,
+                            counts: np.ndarray, statistic: str, decimals: int) -> None:
+    """Replace the sums or means in result that are close to a tie when rounded to the given
+    number of decimals with the sum or mean of the values of their bin added in order.
+    """
+    near_tie = np.flatnonzero(near_ties(result, decimals))
+    for index, start, count in zip(near_tie.tolist(), starts[near_tie].tolist(),
+                                   counts[near_tie].tolist()):
+        total = sum(values[start:start + count].tolist())
+        result[index] = total / count if statistic == 'mean' else total
+
+
+def _boundaries(bins: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the distinct values of the sorted array bins, the index each of them starts at,
+    and the number of times each of them occurs.
+    """
+    if len(bins) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    starts = np.concatenate(([0], np.flatnonzero(bins[1:] != bins[:-1]) + 1))
+    counts = np.diff(np.append(starts, len(bins)))
+    return bins[starts], starts, counts
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'typing', 'sea_level_series'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,198 @@
+"""
+This file builds and reads the asset pack of the pygame simulation.
+
+Building the pack is an offline step: every image is loaded, scaled to its display size and
+cropped to the part of it that can ever be on the screen (for example, the left 200 pixels of
+the Venice image are never shown, since it is drawn at (-200, 0)). The raw pixels of the
+cropped images are stored one after the other in a single pack file, after a JSON index with
+the size, pixel format and position of every image.
+
+At runtime the pack file is memory-mapped and every image is made into a surface straight from
+the mapped pixels, so no image file is decoded or scaled. An image is only taken from the pack
+if its source file, display size and placements did not change since the pack was built.
+
+Usage: python asset_pack.py [image directory] [pack file]
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+import pygame
+from scenes import IMAGE_DIRECTORY, IMAGES, SCENES, SCREENHEIGHT, SCREENWIDTH
+
+PACK_FILENAME = 'assets.pack'
+PACK_MAGIC = b'SLRPACK\0'
+PACK_FORMAT_VERSION = 1
+# The magic bytes, the format version and the length of the JSON index
+HEADER = struct.Struct('<8sII')
+# The pixel data of every image starts at a multiple of this many bytes
+ALIGNMENT = 64
+
+
+def image_placements(name: str) -> List[Tuple[int, Optional[int]]]:
+    """Return every position the given image is drawn at, where a y coordinate of None means
+    the image moves up and down, like the water.
+    """
+    placements = [(0, 0)] if name == 'home_screen' else []
+    for scene in SCENES.values():
+        placements.extend(position for image, position in scene.layers if image == name)
+        if scene.water == name:
+            placements.append((0, None))
+    return placements
+
+
+def visible_rect(size: Tuple[int, int], placements: List[Tuple[int, Optional[int]]]) \
+        -> pygame.Rect:
+    """Return the part of an image of the given size that is on the screen when it is drawn at
+    any of the given placements, in the coordinates of the image.
+
+    Return the whole image if it has no placements.
+    """
+    image_rect = pygame.Rect((0, 0), size)
+    if not placements:
+        return image_rect
+    parts = []
+    for x, y in placements:
+        if y is None:
+            screen = pygame.Rect(-x, 0, SCREENWIDTH, size[1])
+        else:
+            screen = pygame.Rect(-x, -y, SCREENWIDTH, SCREENHEIGHT)
+        parts.append(image_rect.clip(screen))
+    return parts[0].unionall(parts[1:])
+
+
+def build_pack(image_dir: str = IMAGE_DIRECTORY, pack_file: Optional[str] = None) -> str:
+    """Write the asset pack of every image in image_dir and return the path of the pack file,
+    which is PACK_FILENAME in image_dir by default.
+
+    pygame must be initialized; no display is needed.
+    """
+    if pack_file is None:
+        pack_file = os.path.join(image_dir, PACK_FILENAME)
+
+    index = {}
+    pixels = []
+    offset = 0
+    for name, (filename, size) in IMAGES.items():
+        path = os.path.join(image_dir, filename)
+        image = pygame.image.load(path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        crop = visible_rect(image.get_size(), image_placements(name))
+        pixel_format = 'RGBA' if image.get_flags() & pygame.SRCALPHA \
+            or image.get_colorkey() is not None else 'RGB'
+        data = pygame.image.tostring(image.subsurface(crop), pixel_format)
+
+        stat = os.stat(path)
+        index[name] = {'file': filename, 'file_size': stat.st_size,
+                       'mtime_ns': stat.st_mtime_ns, 'size': size,
+                       'placements': image_placements(name), 'origin': [crop.x, crop.y],
+                       'width': crop.width, 'height': crop.height, 'format': pixel_format,
+                       'offset': offset, 'length': len(data)}
+        pixels.append(data)
+        offset += _padded(len(data))
+
+    encoded = json.dumps(index).encode()
+    temporary = f'{pack_file}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(PACK_MAGIC, PACK_FORMAT_VERSION, len(encoded)))
+        file.write(encoded)
+        file.write(bytes(_padded(file.tell()) - file.tell()))
+        for data in pixels:
+            file.write(data)
+            file.write(bytes(_padded(len(data)) - len(data)))
+    os.replace(temporary, pack_file)
+    return pack_file
+
+
+class AssetPack:
+    """A memory-mapped asset pack file.
+
+    Instance Attributes:
+        - pack_file: the path of the pack file
+        - image_dir: the directory of the source image files of the pack
+        - index: the entry of every image in the pack, by name
+    """
+    pack_file: str
+    image_dir: str
+    index: Dict[str, dict]
+    # Private Instance Attributes:
+    #   - _map: the memory map of the pack file
+    #   - _data_start: the position of the pixel data of the first image in the pack file
+    _map: mmap.mmap
+    _data_start: int
+
+    def __init__(self, pack_file: str, image_dir: str = IMAGE_DIRECTORY) -> None:
+        """Open and memory-map the given pack file.
+
+        Raise a ValueError if the file is not an asset pack of this format version.
+        """
+        self.pack_file = pack_file
+        self.image_dir = image_dir
+        with open(pack_file, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, index_length = HEADER.unpack_from(self._map)
+        except struct.error:
+            magic, version, index_length = b'', 0, 0
+        if magic != PACK_MAGIC or version != PACK_FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f'{pack_file} is not a version {PACK_FORMAT_VERSION} asset pack')
+        self.index = json.loads(self._map[HEADER.size:HEADER.size + index_length])
+        self._data_start = _padded(HEADER.size + index_length)
+
+    def has_image(self, name: str) -> bool:
+        """Return whether the pack has an up to date copy of the given image."""
+        entry = self.index.get(name)
+        if entry is None or name not in IMAGES:
+            return False
+        filename, size = IMAGES[name]
+        if entry['file'] != filename or entry['size'] != (None if size is None else list(size)) \
+                or entry['placements'] != [list(position) for position in image_placements(name)]:
+            return False
+        try:
+            stat = os.stat(os.path.join(self.image_dir, filename))
+        except OSError:
+            # the pack can be shipped without the source images
+            return True
+        return stat.st_size == entry['file_size'] and stat.st_mtime_ns == entry['mtime_ns']
+
+    def image(self, name: str) -> pygame.Surface:
+        """Return the cropped image of the given name. The surface uses the memory-mapped
+        pixels of the pack without copying them.
+
+        Preconditions:
+            - self.has_image(name)
+        """
+        entry = self.index[name]
+        start = self._data_start + entry['offset']
+        pixels = memoryview(self._map)[start:start + entry['length']]
+        return pygame.image.frombuffer(pixels, (entry['width'], entry['height']),
+                                       entry['format'])
+
+    def origin(self, name: str) -> Tuple[int, int]:
+        """Return the position of the cropped image of the given name in the uncropped image.
+
+        Preconditions:
+            - self.has_image(name)
+        """
+        x, y = self.index[name]['origin']
+        return x, y
+
+
+def _padded(length: int) -> int:
+    """Return length rounded up to a multiple of ALIGNMENT."""
+    return -(-length // ALIGNMENT) * ALIGNMENT
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    pygame.init()
+    written = build_pack(arguments[0] if len(arguments) > 0 else IMAGE_DIRECTORY,
+                         arguments[1] if len(arguments) > 1 else None)
+    print(f'wrote {written} ({os.path.getsize(written)} bytes)')
@@ -0,0 +1,234 @@
+"""
+This file handles loading the images of the pygame simulation.
+
+Images are loaded one scene at a time, the first time the scene is entered, and are converted
+to the pixel format of the display so blitting them does not convert every pixel again. When
+the loaded images use more memory than the budget, the images of the scenes that were used
+least recently are dropped; they are loaded again if their scene is entered later.
+
+If the image directory has an asset pack built by asset_pack.py, the images in it are taken
+from the memory-mapped pack instead of being decoded and scaled. They are cropped to the part
+that can be on the screen, and origin gives the position of that part in the whole image.
+
+The images of other scenes can also be preloaded while the home screen is shown: a worker
+thread decodes and scales them, and the main thread converts them to the display format (which
+has to happen on the thread that owns the display) whenever it polls the asset manager.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import pygame
+from asset_pack import PACK_FILENAME, AssetPack
+from scenes import IMAGE_DIRECTORY, IMAGES, SCENES
+
+DEFAULT_BUDGET_BYTES = 16 * 1024 * 1024
+
+# Mapping every scene (and the home screen) to the names of the images it draws
+SCENE_IMAGES: Dict[str, List[str]] = {'home': ['home_screen']}
+SCENE_IMAGES.update({name: scene.images() for name, scene in SCENES.items()})
+
+
+class AssetManager:
+    """Loads, converts and evicts the images of the simulation one scene at a time.
+
+    Instance Attributes:
+        - image_dir: the directory the image files are in
+        - budget_bytes: the number of bytes of pixel data to keep loaded, at most, besides the
+          images of the current scene
+        - pack: the asset pack the images are taken from, or None if there is no pack
+
+    Representation Invariants:
+        - self.budget_bytes >= 0
+    """
+    image_dir: str
+    budget_bytes: int
+    pack: Optional[AssetPack]
+    # Private Instance Attributes:
+    #   - _images: the loaded images, by name
+    #   - _scenes: the loaded scenes, from the least to the most recently used
+    #   - _packed: the names of the images taken from the pack
+    #   - _pending: the names of the images the worker thread has not delivered yet
+    #   - _decoded: the images decoded and scaled by the worker thread, or None for images it
+    #     could not load, waiting to be converted by the main thread
+    _images: Dict[str, pygame.Surface]
+    _scenes: 'OrderedDict[str, None]'
+    _packed: Set[str]
+    _pending: Set[str]
+    _decoded: 'queue.Queue[Tuple[str, Optional[pygame.Surface]]]'
+
+    def __init__(self, image_dir: str = IMAGE_DIRECTORY,
+                 budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 pack_file: Optional[str] = None) -> None:
+        """Initialize a new asset manager with no images loaded.
+
+        The asset pack is PACK_FILENAME in image_dir by default, and is not used if it does not
+        exist or cannot be read.
+        """
+        self.image_dir = image_dir
+        self.budget_bytes = budget_bytes
+        if pack_file is None:
+            pack_file = os.path.join(image_dir, PACK_FILENAME)
+        try:
+            self.pack = AssetPack(pack_file, image_dir)
+        except (OSError, ValueError):
+            self.pack = None
+        self._packed = {name for name in IMAGES if self.pack is not None
+                        and self.pack.has_image(name)}
+        self._images = {}
+        self._scenes = OrderedDict()
+        self._pending = set()
+        self._decoded = queue.Queue()
+
+    def load_scene(self, scene: str) -> Dict[str, pygame.Surface]:
+        """Return the images of the given scene by name, loading any that are not loaded yet,
+        and evict other scenes if the budget is exceeded.
+
+        The display must be set up before calling this method. Images that are still being
+        preloaded are loaded again here, so call is_ready first to avoid that.
+
+        Preconditions:
+            - scene in SCENE_IMAGES
+        """
+        self.poll()
+        for name in SCENE_IMAGES[scene]:
+            if name not in self._images:
+                self._images[name] = self.load_image(name)
+
+        self._scenes[scene] = None
+        self._scenes.move_to_end(scene)
+        self._evict(scene)
+
+        return {name: self._images[name] for name in SCENE_IMAGES[scene]}
+
+    def load_image(self, name: str) -> pygame.Surface:
+        """Return the given image loaded from its file, scaled to its display size and
+        converted to the display's pixel format.
+        """
+        return convert_for_display(self.decode_image(name))
+
+    def decode_image(self, name: str) -> pygame.Surface:
+        """Return the given image loaded from its file and scaled to its display size (or taken
+        from the pack), without converting it, so it can be called without a display and from
+        any thread.
+        """
+        if name in self._packed:
+            return self.pack.image(name)
+        filename, size = IMAGES[name]
+        image = pygame.image.load(os.path.join(self.image_dir, filename))
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        return image
+
+    def origin(self, name: str) -> Tuple[int, int]:
+        """Return the position of the loaded part of the given image in the whole image, which
+        is not (0, 0) if the image was cropped by the asset pack.
+        """
+        if name in self._packed:
+            return self.pack.origin(name)
+        return 0, 0
+
+    def preload(self, scenes: Iterable[str]) -> None:
+        """Start decoding the images of the given scenes that are not loaded yet on a worker
+        thread. They become loaded as the main thread calls poll.
+
+        Preconditions:
+            - all(scene in SCENE_IMAGES for scene in scenes)
+        """
+        names = []
+        for scene in scenes:
+            names.extend(name for name in SCENE_IMAGES[scene]
+                         if name not in self._images and name not in self._pending
+                         and name not in names)
+        if not names:
+            return
+        self._pending.update(names)
+        threading.Thread(target=self._decode_all, args=(names,), daemon=True).start()
+
+    def poll(self) -> None:
+        """Convert the images the worker thread has decoded so far to the display format.
+
+        Decoded images that do not fit in the budget are dropped, and loaded when their scene
+        is entered instead.
+        """
+        while True:
+            try:
+                name, image = self._decoded.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.discard(name)
+            if image is not None and name not in self._images \
+                    and self.loaded_bytes() + surface_bytes(image) <= self.budget_bytes:
+                self._images[name] = convert_for_display(image)
+
+    def progress(self, scene: str) -> float:
+        """Return the fraction of the images of the given scene that are loaded or will not be
+        delivered by the worker thread, after polling it.
+        """
+        self.poll()
+        names = SCENE_IMAGES[scene]
+        return sum(name not in self._pending for name in names) / len(names)
+
+    def is_ready(self, scene: str) -> bool:
+        """Return whether load_scene can return the images of the given scene without waiting
+        for the worker thread.
+        """
+        return self.progress(scene) == 1.0
+
+    def loaded_bytes(self) -> int:
+        """Return the number of bytes of pixel data of the loaded images."""
+        return sum(surface_bytes(image) for image in self._images.values())
+
+    def loaded_scenes(self) -> List[str]:
+        """Return the loaded scenes, from the least to the most recently used."""
+        return list(self._scenes)
+
+    def _decode_all(self, names: List[str]) -> None:
+        """Decode the given images one after the other and hand them to the main thread."""
+        for name in names:
+            try:
+                image = self.decode_image(name)
+            except (pygame.error, OSError):
+                # load_scene reports the error when the image is loaded on the main thread
+                image = None
+            self._decoded.put((name, image))
+
+    def _evict(self, current: str) -> None:
+        """Drop the images of the least recently used scenes other than current until the
+        loaded images fit in the budget.
+        """
+        while self.loaded_bytes() > self.budget_bytes and len(self._scenes) > 1:
+            oldest = next(scene for scene in self._scenes if scene != current)
+            del self._scenes[oldest]
+            still_used = {name for scene in self._scenes for name in SCENE_IMAGES[scene]}
+            for name in SCENE_IMAGES[oldest]:
+                if name not in still_used:
+                    self._images.pop(name, None)
+
+
+def convert_for_display(image: pygame.Surface) -> pygame.Surface:
+    """Return a copy of image in the pixel format of the display, keeping per-pixel alpha if
+    the image has it.
+    """
+    if image.get_flags() & pygame.SRCALPHA:
+        return image.convert_alpha()
+    return image.convert()
+
+
+def surface_bytes(image: pygame.Surface) -> int:
+    """Return the number of bytes of pixel data of the given surface."""
+    return image.get_pitch() * image.get_height()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['os', 'queue', 'threading', 'collections', 'typing', 'pygame',
+                          'asset_pack', 'scenes'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
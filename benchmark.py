@@ -0,0 +1,543 @@
+"""
+This file benchmarks the computation stages of the program on inputs of 1e3 to 1e8 rows.
+
+Every stage (parsing the csv file, averaging by year, projecting, combining the yearly data,
+splitting the rise into its factors and computing the water offsets of the scenes) is timed on
+synthetic inputs of growing size, with the current NumPy implementation and with a copy of the
+original dictionary implementation it replaced. The whole pipeline, from a csv file without a
+cache to the factor contributions, is timed as well. The original implementations only run up to LEGACY_MAX_ROWS rows,
+since they hold a Python object per row; where they run, the results of both implementations
+are checked to be numerically the same.
+
+Parsing is bound by the csv module in both implementations, so the block reader is not faster
+than read_csv (it is up to about 1.5x slower on small files); it is used for its bounded memory
+and its arrays, and the benchmark keeps it from getting slower.
+
+The timings are written to a json file. Every timing of the current implementation is compared
+with a baseline file from an earlier run, and the benchmark fails if one is slower than the
+baseline by more than the tolerance, or if there is no baseline file. With --save-baseline, the
+results are saved as the baseline instead.
+
+Usage: python benchmark.py [--save-baseline] [largest number of rows] [results file]
+       [baseline file] [tolerance]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import csv
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from aggregation import aggregate
+from computations import combine_data, factor_contribution, load_combined_data
+from factors import COMPONENTS, DEFAULT_SHARES, decompose
+from gmsl_cache import CACHE_DIRECTORY_NAME
+from gmsl_generator import generate_csv
+from gmsl_reader import read_series
+from projection import DEFAULT_SCHEDULE, project_batch, schedule_boundaries, time_grid
+from scenes import SCENES
+from sea_level_series import SeaLevelSeries
+from water_offsets import WaterOffsets
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8)
+DEFAULT_MAX_ROWS = 10 ** 6
+LEGACY_MAX_ROWS = 10 ** 6
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+# Timings shorter than this are too noisy to fail the regression check, in seconds
+MIN_REGRESSION_SECONDS = 0.005
+SEED = 0
+SAVE_BASELINE_FLAG = '--save-baseline'
+
+FIRST_YEAR = 1993
+LAST_MEASURED_YEAR = 2020
+
+
+###########################################################################################
+# Copies of the original dictionary implementations
+###########################################################################################
+def legacy_read_csv(filename: str) -> Dict[str, float]:
+    """The original read_csv."""
+    average_data = {}
+    with open(filename) as file:
+        reader = csv.reader(file)
+
+        for _ in range(0, 8):  # skip over the first 8 rows
+            next(reader)
+
+        for row in reader:
+            if row[4] != '':
+                average_data[row[0]] = float(row[4])
+            elif row[3] != '':
+                average_data[row[0]] = float(row[3])
+            elif row[2] != '':
+                average_data[row[0]] = float(row[2])
+            else:
+                average_data[row[0]] = float(row[1])
+
+        return average_data
+
+
+def legacy_mean_sea_level_change(csv_data: Dict[str, float]) -> Dict[str, float]:
+    """The original mean_sea_level_change."""
+    average_data = {}
+
+    for year in csv_data:
+        whole_year = year[0:4]
+        if whole_year not in average_data:
+            average_data[whole_year] = [csv_data[year]]
+        else:
+            average_data[whole_year].append(csv_data[year])
+
+    for year in average_data:
+        average_data[year] = round(sum(average_data[year]) / len(average_data[year]), 2)
+
+    return average_data
+
+
+def legacy_predict_2021_2080(sea_level_2020: float) -> Dict[str, float]:
+    """The original predict_2021_2080."""
+    data_2021 = {'2020': sea_level_2020}
+
+    for year in range(2021, 2081):
+        data_2021[str(year)] = round(data_2021[str(year - 1)] + 3.3, 2)
+
+    return data_2021
+
+
+def legacy_predict_2081_2100(sea_level_2080: float) -> Dict[str, float]:
+    """The original predict_2081_2100."""
+    data_2081 = {'2080': sea_level_2080}
+
+    for year in range(2081, 2101):
+        data_2081[str(year)] = round(data_2081[str(year - 1)] + 12.0, 2)
+
+    return data_2081
+
+
+def legacy_combine_data(data_1993: Dict[str, float], data_2021: Dict[str, float],
+                        data_2081: Dict[str, float]) -> Dict[str, float]:
+    """The original combine_data."""
+    data_1993.update(data_2021)
+    data_1993.update(data_2081)
+
+    return data_1993
+
+
+def legacy_factor_contribution(total_data: Dict[str, float]) -> Dict[str, List[float]]:
+    """The original factor_contribution."""
+    factor_data = {}
+
+    for year in total_data:
+        heat_capacity_contribution = round(0.41 * total_data[year], 2)
+        glaciers_contribution = round(0.35 * total_data[year], 2)
+        ice_sheets_contribution = round(0.24 * total_data[year], 2)
+        factor_data[year] = [heat_capacity_contribution, glaciers_contribution,
+                             ice_sheets_contribution]
+
+    return factor_data
+
+
+def legacy_water_offsets(data: Dict[str, float]) -> Dict[str, Dict[str, int]]:
+    """The scale dictionaries of the original simulation, and the water offsets the simulation
+    computed from them every frame.
+    """
+    scale_human_data = {}
+    scale_venice_data = {}
+    scale_newyork_data = {}
+    scale_amsterdam_data = {}
+
+    # Scaling data to fit visual models
+    for i in data:
+        scale_human_data[i] = data[i] / 3
+        scale_venice_data[i] = data[i] / 13
+        scale_newyork_data[i] = data[i] / 60
+        scale_amsterdam_data[i] = data[i] / 20
+
+    return {'human': {i: 600 - int(scale_human_data[i]) for i in data},
+            'venice': {i: 535 - int(scale_venice_data[i]) for i in data},
+            'new_york': {i: 532 - int(scale_newyork_data[i]) for i in data},
+            'amsterdam': {i: 525 - int(scale_amsterdam_data[i]) for i in data}}
+
+
+###########################################################################################
+# Benchmark stages
+###########################################################################################
+class Stage:
+    """A computation stage benchmarked with its current and its original implementation.
+
+    Instance Attributes:
+        - name: the name of the stage
+        - setup: a function returning the (current, legacy) inputs of the stage for a number of
+          rows, in a temporary directory, with a random number generator; it is not timed
+        - current: the current implementation, called with the current input
+        - legacy: the original implementation, called with the legacy input
+        - check: a function returning whether the current and the legacy results are the same
+        - max_rows: the largest number of rows the current implementation is run on, or None
+          if it runs on every size
+    """
+    name: str
+    setup: Callable[[int, str, np.random.Generator], Tuple[Any, Any]]
+    current: Callable[[Any], Any]
+    legacy: Callable[[Any], Any]
+    check: Callable[[Any, Any], bool]
+    max_rows: Optional[int]
+
+    def __init__(self, name: str,
+                 setup: Callable[[int, str, np.random.Generator], Tuple[Any, Any]],
+                 current: Callable[[Any], Any], legacy: Callable[[Any], Any],
+                 check: Callable[[Any, Any], bool], max_rows: Optional[int] = None) -> None:
+        """Initialize a new stage with the specified parameters"""
+        self.name = name
+        self.setup = setup
+        self.current = current
+        self.legacy = legacy
+        self.check = check
+        self.max_rows = max_rows
+
+
+def measured_times(rows: int) -> np.ndarray:
+    """Return rows evenly spaced times from the start of FIRST_YEAR to the end of
+    LAST_MEASURED_YEAR, rounded to 9 decimals.
+    """
+    span = LAST_MEASURED_YEAR + 1 - FIRST_YEAR
+    return np.round(FIRST_YEAR + np.arange(rows, dtype=np.float64) * (span / rows), 9)
+
+
+def time_labels(times: np.ndarray) -> List[str]:
+    """Return the times written with enough decimals to tell every one of them apart."""
+    return [f'{time_:.9f}' for time_ in times.tolist()]
+
+
+def _setup_parse(rows: int, directory: str, rng: np.random.Generator) -> Tuple[str, str]:
+    """Return the name of a synthetic csv file with the given number of rows from the start of
+    FIRST_YEAR to the end of LAST_MEASURED_YEAR, twice.
+    """
+    filename = os.path.join(directory, f'gmsl_{rows}.csv')
+    span = LAST_MEASURED_YEAR + 1 - FIRST_YEAR
+    generate_csv(filename, rows, int(rng.integers(2 ** 32)), samples_per_year=rows / span,
+                 start_year=FIRST_YEAR)
+    return filename, filename
+
+
+def _check_parse(series: SeaLevelSeries, data: Dict[str, float]) -> bool:
+    """Return whether the parsed series holds the same rows as the parsed dictionary."""
+    return len(series) == len(data) and \
+        np.allclose(series.times, [float(key) for key in data], rtol=0, atol=1e-9) and \
+        np.array_equal(series.values, list(data.values()))
+
+
+def _setup_aggregate(rows: int, _: str, rng: np.random.Generator) \
+        -> Tuple[SeaLevelSeries, Optional[Dict[str, float]]]:
+    """Return a series with the given number of rows and, if it is not too large, the same
+    series as a dictionary.
+    """
+    times = measured_times(rows)
+    values = rng.normal(0.0, 30.0, rows)
+    data = dict(zip(time_labels(times), values.tolist())) if rows <= LEGACY_MAX_ROWS else None
+    return SeaLevelSeries(times, values), data
+
+
+def _aggregate_current(series: SeaLevelSeries) -> Dict[str, float]:
+    """Return the rounded yearly means of series, like mean_sea_level_change."""
+    return aggregate(series, 'year', 'mean', decimals=2).to_dict(decimals=2)
+
+
+def _check_aggregate(means: Dict[str, float], data: Dict[str, float]) -> bool:
+    """Return whether the rounded yearly means are exactly the original means."""
+    return means == data and list(means) == list(data)
+
+
+def _setup_project(rows: int, _: str, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the 2020 sea levels of enough projections to project rows values in total."""
+    count = max(1, rows // len(_projection_times()))
+    start_levels = rng.normal(90.0, 30.0, count).round(2)
+    return start_levels, start_levels
+
+
+def _projection_times() -> np.ndarray:
+    """Return the years projected by the default schedule."""
+    boundaries = schedule_boundaries(DEFAULT_SCHEDULE)
+    return time_grid(boundaries[0], boundaries[-1])
+
+
+def _project_current(start_levels: np.ndarray) -> np.ndarray:
+    """Project every start level with the default schedule at once."""
+    boundaries = schedule_boundaries(DEFAULT_SCHEDULE)
+    rates = np.broadcast_to([segment.rate for segment in DEFAULT_SCHEDULE],
+                            (len(start_levels), len(DEFAULT_SCHEDULE)))
+    return project_batch(start_levels, rates, boundaries, _projection_times())
+
+
+def _project_legacy(start_levels: np.ndarray) -> List[Dict[str, float]]:
+    """Project every start level with the original prediction functions."""
+    projections = []
+    for start_level in start_levels.tolist():
+        data = legacy_predict_2021_2080(start_level)
+        data.update(legacy_predict_2081_2100(data['2080']))
+        projections.append(data)
+    return projections
+
+
+def _check_project(levels: np.ndarray, projections: List[Dict[str, float]]) -> bool:
+    """Return whether the projected levels are the same as the rounded original projections."""
+    legacy = np.array([list(data.values()) for data in projections])
+    return levels.shape == legacy.shape and np.allclose(levels, legacy, rtol=0, atol=0.01)
+
+
+def _setup_combine(rows: int, _: str, rng: np.random.Generator) \
+        -> Tuple[List[Dict[str, float]], List[Dict[str, float]]]:
+    """Return three dictionaries of yearly sea levels with rows values in total, split like
+    the measured years and the two prediction periods of 1993 to 2100.
+    """
+    levels = rng.normal(90.0, 30.0, rows).round(2).tolist()
+    years = [str(year) for year in range(rows)]
+    bounds = [0, rows * 28 // 108, rows * 88 // 108, rows]
+    parts = [dict(zip(years[bounds[i]:bounds[i + 1]], levels[bounds[i]:bounds[i + 1]]))
+             for i in range(3)]
+    return parts, parts
+
+
+def _combine_current(parts: List[Dict[str, float]]) -> Dict[str, float]:
+    """Return combine_data of the given dictionaries, copying the first one, which it
+    modifies, so every repeat starts from the same input.
+    """
+    return combine_data(dict(parts[0]), parts[1], parts[2])
+
+
+def _combine_legacy(parts: List[Dict[str, float]]) -> Dict[str, float]:
+    """Return legacy_combine_data of the given dictionaries, copying the first one like
+    _combine_current.
+    """
+    return legacy_combine_data(dict(parts[0]), parts[1], parts[2])
+
+
+def _check_combine(data: Dict[str, float], legacy: Dict[str, float]) -> bool:
+    """Return whether the combined dictionaries are the same, in the same order."""
+    return data == legacy and list(data) == list(legacy)
+
+
+def _setup_factor(rows: int, _: str, rng: np.random.Generator) \
+        -> Tuple[np.ndarray, Optional[Dict[str, float]]]:
+    """Return yearly sea levels for the given number of years, as an array and, if it is not
+    too large, as a dictionary.
+    """
+    levels = rng.normal(90.0, 30.0, rows).round(2)
+    data = dict(zip([str(year) for year in range(rows)], levels.tolist())) \
+        if rows <= LEGACY_MAX_ROWS else None
+    return levels, data
+
+
+def _setup_factor_data(rows: int, directory: str, rng: np.random.Generator) \
+        -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Return yearly sea levels for the given number of years as a dictionary, twice."""
+    data = _setup_factor(rows, directory, rng)[1]
+    return data, data
+
+
+def _check_factor_data(factors: Dict[str, List[float]], legacy: Dict[str, List[float]]) -> bool:
+    """Return whether the rounded factor contributions are exactly the original ones."""
+    return factors == legacy and list(factors) == list(legacy)
+
+
+def _check_decompose(factors: np.ndarray, legacy: Dict[str, List[float]]) -> bool:
+    """Return whether the factor contributions are the same as the rounded original
+    contributions.
+    """
+    return factors.shape == (len(legacy), len(COMPONENTS)) and \
+        np.allclose(factors, list(legacy.values()), rtol=0, atol=0.005 + 1e-9)
+
+
+def _setup_offsets(rows: int, _: str, rng: np.random.Generator) \
+        -> Tuple[SeaLevelSeries, Optional[Dict[str, float]]]:
+    """Return yearly sea levels for the given number of years, as a series and, if it is not
+    too large, as a dictionary.
+    """
+    values = rng.normal(0.0, 500.0, rows).round(2)
+    data = dict(zip([str(year) for year in range(rows)], values.tolist())) \
+        if rows <= LEGACY_MAX_ROWS else None
+    return SeaLevelSeries.annual(0, values), data
+
+
+def _check_offsets(offsets: WaterOffsets, legacy: Dict[str, Dict[str, int]]) -> bool:
+    """Return whether the water offsets of every scene are the same."""
+    return all(np.array_equal(offsets.scene(name), list(legacy[name].values()))
+               for name in SCENES)
+
+
+def _pipeline_current(filename: str) -> Tuple[Dict[str, float], Dict[str, List[float]]]:
+    """Return the yearly data of the given csv file and its factor contributions the way the
+    program computes them, after deleting the csv cache so the file is parsed again.
+    """
+    shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(filename)),
+                               CACHE_DIRECTORY_NAME), ignore_errors=True)
+    data = load_combined_data(filename)
+    return data, factor_contribution(data)
+
+
+def _pipeline_legacy(filename: str) -> Tuple[Dict[str, float], Dict[str, List[float]]]:
+    """Return the yearly data of the given csv file and its factor contributions with the
+    original functions.
+    """
+    data_1993 = legacy_mean_sea_level_change(legacy_read_csv(filename))
+    data_2021 = legacy_predict_2021_2080(data_1993['2020'])
+    data_2081 = legacy_predict_2081_2100(data_2021['2080'])
+    data = legacy_combine_data(data_1993, data_2021, data_2081)
+    return data, legacy_factor_contribution(data)
+
+
+def _check_pipeline(result: Tuple[Dict[str, float], Dict[str, List[float]]],
+                    legacy: Tuple[Dict[str, float], Dict[str, List[float]]]) -> bool:
+    """Return whether the yearly data and the factor contributions are exactly the original
+    ones.
+    """
+    return result == legacy and list(result[0]) == list(legacy[0])
+
+
+STAGES = [
+    Stage('parse', _setup_parse, read_series, legacy_read_csv, _check_parse),
+    Stage('aggregate', _setup_aggregate, _aggregate_current, legacy_mean_sea_level_change,
+          _check_aggregate),
+    Stage('project', _setup_project, _project_current, _project_legacy, _check_project),
+    Stage('combine', _setup_combine, _combine_current, _combine_legacy, _check_combine,
+          LEGACY_MAX_ROWS),
+    Stage('factor', _setup_factor_data, factor_contribution, legacy_factor_contribution,
+          _check_factor_data, LEGACY_MAX_ROWS),
+    Stage('decompose', _setup_factor, lambda levels: decompose(levels, DEFAULT_SHARES),
+          legacy_factor_contribution, _check_decompose),
+    Stage('offsets', _setup_offsets, WaterOffsets.from_series, legacy_water_offsets,
+          _check_offsets),
+    Stage('pipeline', _setup_parse, _pipeline_current, _pipeline_legacy, _check_pipeline)
+]
+
+
+###########################################################################################
+# Running the benchmark
+###########################################################################################
+def time_call(function: Callable[[Any], Any], argument: Any, repeat: int) -> Tuple[float, Any]:
+    """Return the shortest time in seconds of repeat calls of function with argument, and the
+    result of the last call.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        result = None
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(max_rows: int = DEFAULT_MAX_ROWS, seed: int = SEED) -> Dict[str, Any]:
+    """Time every stage for every size of SIZES up to max_rows and return the results.
+
+    Raise an AssertionError if the current and the original implementation of a stage give
+    different results.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in [size for size in SIZES if size <= max_rows]:
+            for stage in STAGES:
+                if stage.max_rows is not None and rows > stage.max_rows:
+                    continue
+                rng = np.random.default_rng(seed)
+                current_input, legacy_input = stage.setup(rows, directory, rng)
+                repeat = 3 if rows <= 10 ** 6 else 1
+
+                seconds, current_result = time_call(stage.current, current_input, repeat)
+                result = {'stage': stage.name, 'rows': rows, 'seconds': seconds}
+
+                if rows <= LEGACY_MAX_ROWS:
+                    legacy_seconds, legacy_result = time_call(stage.legacy, legacy_input, 1)
+                    if not stage.check(current_result, legacy_result):
+                        raise AssertionError(f'{stage.name} on {rows} rows differs from the '
+                                             f'original implementation')
+                    result['legacy_seconds'] = legacy_seconds
+                    result['speedup'] = legacy_seconds / max(seconds, 1e-12)
+
+                results.append(result)
+                print(format_result(result))
+                del current_input, legacy_input, current_result
+
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'seed': seed, 'results': results}
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """Return a line of text describing the given result."""
+    line = f'{result["stage"]:<10}{result["rows"]:>11,} rows  {result["seconds"] * 1000:10.2f} ms'
+    if 'legacy_seconds' in result:
+        if result['speedup'] >= 1:
+            comparison = f'{result["speedup"]:7.1f}x faster'
+        else:
+            comparison = f'{1 / result["speedup"]:7.1f}x slower'
+        line += f'  (original {result["legacy_seconds"] * 1000:10.2f} ms, {comparison})'
+    return line
+
+
+def regressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Return a description of every timing of results that is slower than the same timing of
+    baseline by more than tolerance (as a fraction of the baseline timing).
+
+    Timings under MIN_REGRESSION_SECONDS in both runs are not compared.
+    """
+    previous = {(result['stage'], result['rows']): result['seconds']
+                for result in baseline['results']}
+    slower = []
+    for result in results['results']:
+        key = (result['stage'], result['rows'])
+        if key not in previous or max(result['seconds'], previous[key]) < MIN_REGRESSION_SECONDS:
+            continue
+        if result['seconds'] > previous[key] * (1 + tolerance):
+            slower.append(f'{key[0]} on {key[1]:,} rows: {result["seconds"] * 1000:.2f} ms, '
+                          f'baseline {previous[key] * 1000:.2f} ms')
+    return slower
+
+
+def main(max_rows: int = DEFAULT_MAX_ROWS, results_file: str = RESULTS_FILE,
+         baseline_file: str = BASELINE_FILE, tolerance: float = DEFAULT_TOLERANCE,
+         save_baseline: bool = False) -> bool:
+    """Run the benchmark, write its results to results_file and return whether no stage is
+    slower than in baseline_file.
+
+    If save_baseline is True, the results are saved to baseline_file instead of being compared
+    with it. Otherwise, return False if baseline_file does not exist.
+    """
+    results = run_benchmark(max_rows)
+    with open(results_file, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    if save_baseline:
+        with open(baseline_file, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'saved the results as the baseline {baseline_file}')
+        return True
+    if not os.path.exists(baseline_file):
+        print(f'no baseline {baseline_file} to compare with, run with {SAVE_BASELINE_FLAG} '
+              f'to save one')
+        return False
+
+    with open(baseline_file) as file:
+        baseline = json.load(file)
+    slower = regressions(results, baseline, tolerance)
+    for line in slower:
+        print(f'slower than the baseline: {line}')
+    return not slower
+
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:] if argument != SAVE_BASELINE_FLAG]
+    sys.exit(0 if main(int(float(arguments[0])) if len(arguments) > 0 else DEFAULT_MAX_ROWS,
+                       arguments[1] if len(arguments) > 1 else RESULTS_FILE,
+                       arguments[2] if len(arguments) > 2 else BASELINE_FILE,
+                       float(arguments[3]) if len(arguments) > 3 else DEFAULT_TOLERANCE,
+                       SAVE_BASELINE_FLAG in sys.argv[1:])
+             else 1)
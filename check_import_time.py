@@ -0,0 +1,80 @@
+"""
+This file checks that importing computations.py stays fast and free of side effects.
+
+Every measurement imports computations in a fresh Python interpreter without a display, and
+records how long the import takes and which heavy modules it loaded. NumPy is imported first,
+so the time it takes is reported on its own, but the budget covers the whole import, NumPy
+included. The check fails if the median import time is over the budget, or if pygame or
+python_ta were imported.
+
+Usage: python check_import_time.py [budget in ms] [number of runs]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+IMPORT_BUDGET_MS = 200.0
+FORBIDDEN_MODULES = ('pygame', 'python_ta')
+
+_MEASURE = (
+    'import json, sys, time\n'
+    'start = time.perf_counter()\n'
+    'import numpy\n'
+    'numpy_loaded = time.perf_counter()\n'
+    'import computations\n'
+    'end = time.perf_counter()\n'
+    'print(json.dumps([(end - start) * 1000, (numpy_loaded - start) * 1000,\n'
+    '                  [name for name in {forbidden!r} if name in sys.modules]]))\n'
+)
+
+
+def measure_import(module_dir: str = '.') -> Tuple[float, float, List[str]]:
+    """Return how many milliseconds importing computations took in a fresh interpreter, how
+    many of them importing NumPy took, and which of the forbidden modules it imported.
+    """
+    environment = dict(os.environ)
+    environment.pop('DISPLAY', None)
+    environment.pop('WAYLAND_DISPLAY', None)
+    output = subprocess.run([sys.executable, '-c', _MEASURE.format(forbidden=FORBIDDEN_MODULES)],
+                            cwd=module_dir, env=environment, capture_output=True, text=True,
+                            check=True).stdout
+    elapsed, numpy_elapsed, imported = json.loads(output.splitlines()[-1])
+    return elapsed, numpy_elapsed, imported
+
+
+def check_import_time(budget_ms: float = IMPORT_BUDGET_MS, runs: int = 7,
+                      module_dir: str = '.') -> bool:
+    """Print the median import time of computations over the given number of runs, and return
+    whether it is within budget_ms and free of forbidden imports.
+    """
+    times = []
+    numpy_times = []
+    imported = set()
+    for _ in range(runs):
+        elapsed, numpy_elapsed, modules = measure_import(module_dir)
+        times.append(elapsed)
+        numpy_times.append(numpy_elapsed)
+        imported.update(modules)
+
+    median = statistics.median(times)
+    print(f'import computations: median {median:.1f} ms (NumPy '
+          f'{statistics.median(numpy_times):.1f} ms), best {min(times):.1f} ms '
+          f'over {runs} runs (budget {budget_ms:.1f} ms)')
+    if imported:
+        print(f'import computations loaded {", ".join(sorted(imported))}')
+
+    return median <= budget_ms and not imported
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    budget = float(arguments[0]) if len(arguments) > 0 else IMPORT_BUDGET_MS
+    run_count = int(arguments[1]) if len(arguments) > 1 else 7
+    sys.exit(0 if check_import_time(budget, run_count,
+                                    os.path.dirname(os.path.abspath(__file__))) else 1)
@@ -0,0 +1,57 @@
+"""
+This file checks that the monthly water offset table keeps the water of every whole year.
+
+The table the simulation uses has WATER_STEPS_PER_YEAR columns per year, and the columns of the
+measured years are interpolated between the monthly averages of the csv rows. The check fails
+if the offset of a whole year of any scene is not the one Scene.water_offset gives for the
+yearly average, which is where a scene stops when the arrow keys are released and what
+frame_renderer.py draws.
+
+Usage: python check_water_offsets.py [csv file]
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import sys
+from typing import List
+from computations import load_combined_data
+from gmsl_cache import load_series
+from scenes import SCENES, WATER_STEPS_PER_YEAR
+from sea_level_series import SeaLevelSeries
+from water_offsets import WaterOffsets
+
+DATA_FILE = 'Datasets/global_mean_sea_level.csv'
+
+
+def whole_year_mismatches(filename: str = DATA_FILE) -> List[str]:
+    """Return a description of every scene and year whose offset in the monthly table of the
+    given csv file is not Scene.water_offset of the yearly average.
+    """
+    data = load_combined_data(filename)
+    offsets = WaterOffsets.from_series(SeaLevelSeries.from_dict(data),
+                                       steps_per_year=WATER_STEPS_PER_YEAR,
+                                       measured=load_series(filename))
+    mismatches = []
+    for name, scene in SCENES.items():
+        for year, sea_level in data.items():
+            expected = scene.water_offset(sea_level)
+            actual = offsets.offset(name, int(year))
+            if actual != expected:
+                mismatches.append(f'{name} in {year}: {actual}, expected {expected}')
+    return mismatches
+
+
+def check_water_offsets(filename: str = DATA_FILE) -> bool:
+    """Print every whole year offset of the monthly table of the given csv file that differs
+    from Scene.water_offset, and return whether there are none.
+    """
+    mismatches = whole_year_mismatches(filename)
+    for line in mismatches:
+        print(f'water offset differs: {line}')
+    print(f'{len(mismatches)} whole year water offsets differ')
+    return not mismatches
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    sys.exit(0 if check_water_offsets(arguments[0] if len(arguments) > 0 else DATA_FILE) else 1)
@@ -0,0 +1,97 @@
+"""
+This file handles redrawing only the parts of the pygame display that changed.
+
+A DirtyRects collects the rectangles of the display that changed during a frame, such as the
+water strip, the year label or a hovered button. The frame is then drawn once per changed
+region with the surface clipped to that region, and only those regions are sent to the screen
+with pygame.display.update, instead of redrawing and flipping the whole window every frame.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+from typing import Iterator, List
+import pygame
+
+
+class DirtyRects:
+    """The regions of the display that need to be drawn again.
+
+    Instance Attributes:
+        - screen_rect: the rectangle of the whole display
+    """
+    screen_rect: pygame.Rect
+    # Private Instance Attributes:
+    #   - _rects: the changed regions since the last update
+    #   - _full: whether the whole display needs to be drawn again
+    _rects: List[pygame.Rect]
+    _full: bool
+
+    def __init__(self, screen_rect: pygame.Rect) -> None:
+        """Initialize a new DirtyRects for a display of the given size, starting with the whole
+        display marked as changed.
+        """
+        self.screen_rect = pygame.Rect(screen_rect)
+        self._rects = []
+        self._full = True
+
+    def mark(self, rect: pygame.Rect) -> None:
+        """Mark the given region of the display as changed."""
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width > 0 and rect.height > 0:
+            self._rects.append(rect)
+
+    def mark_all(self) -> None:
+        """Mark the whole display as changed."""
+        self._full = True
+
+    def is_dirty(self) -> bool:
+        """Return whether any part of the display changed."""
+        return self._full or len(self._rects) > 0
+
+    def regions(self, surface: pygame.Surface) -> Iterator[pygame.Rect]:
+        """Clip surface to every changed region in turn and yield the region, so the frame can
+        be drawn once for each of them. Overlapping regions are merged first.
+
+        Call update after drawing every region.
+        """
+        if self._full:
+            surface.set_clip(None)
+            yield self.screen_rect
+            return
+
+        self._rects = merge_rects(self._rects)
+        for rect in self._rects:
+            surface.set_clip(rect)
+            yield rect
+        surface.set_clip(None)
+
+    def update(self) -> None:
+        """Send the changed regions to the screen and start collecting the next frame's."""
+        if self._full:
+            pygame.display.flip()
+        elif self._rects:
+            pygame.display.update(self._rects)
+        self._rects = []
+        self._full = False
+
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """Return rectangles covering the same area as rects, where no two of them overlap."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['typing', 'pygame'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
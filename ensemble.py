@@ -0,0 +1,203 @@
+"""
+This file handles Monte Carlo ensembles of global mean sea level projections.
+
+Instead of the single curve given by the rates in DEFAULT_SCHEDULE and the fixed contribution
+shares used by factor_contribution, an ensemble samples the rate of every segment from a normal
+distribution and the contribution shares from a Dirichlet distribution, and reports percentiles
+of the resulting trajectories for every year.
+
+Every worker process draws the same parameter samples from the seed and computes the
+trajectories for its own range of years only, so the percentiles are exact, the result does
+not depend on the number of workers, and only the percentiles are sent between processes.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from factors import DEFAULT_SHARES
+from projection import DEFAULT_SCHEDULE, RateSegment, project_batch, schedule_boundaries, \
+    time_grid
+
+# NASA gives the current rate as 3.3 +/- 0.4mm per year, and Church et al. give a likely range
+# of about 8-16mm per year for 2081-2100.
+DEFAULT_RATE_SPREADS = (0.4, 2.0)
+
+DEFAULT_SHARE_CONCENTRATION = 200.0
+
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+
+# The largest number of trajectory values a worker holds in memory at a time
+MAX_BATCH_VALUES = 4_000_000
+
+
+class EnsembleResult:
+    """The percentiles of an ensemble of projections.
+
+    Instance Attributes:
+        - times: the time of every column of the percentile arrays, in years
+        - percentiles: the percentiles that were computed, between 0 and 100
+        - levels: array of shape (len(percentiles), len(times)), levels[p][t] is the
+          percentiles[p]-th percentile of the global mean sea level at times[t]
+        - contributions: array of shape (len(shares), len(percentiles), len(times)) with the
+          percentiles of the rise due to ocean heat capacity, glaciers and ice sheets
+        - size: the number of trajectories in the ensemble
+        - seed: the seed the parameters were sampled from
+    """
+    times: np.ndarray
+    percentiles: Tuple[float, ...]
+    levels: np.ndarray
+    contributions: np.ndarray
+    size: int
+    seed: int
+
+    def __init__(self, times: np.ndarray, percentiles: Tuple[float, ...], levels: np.ndarray,
+                 contributions: np.ndarray, size: int, seed: int) -> None:
+        """Initialize a new ensemble result with the specified parameters"""
+        self.times = times
+        self.percentiles = percentiles
+        self.levels = levels
+        self.contributions = contributions
+        self.size = size
+        self.seed = seed
+
+    def band(self, percentile: float) -> np.ndarray:
+        """Return the given percentile of the global mean sea level for every time."""
+        return self.levels[self.percentiles.index(percentile)]
+
+
+def run_ensemble(start_level: float, size: int = 100_000, seed: int = 0,
+                 schedule: Sequence[RateSegment] = DEFAULT_SCHEDULE,
+                 rate_spreads: Sequence[float] = DEFAULT_RATE_SPREADS,
+                 shares: Sequence[float] = DEFAULT_SHARES,
+                 share_concentration: float = DEFAULT_SHARE_CONCENTRATION,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 step: float = 1.0, workers: Optional[int] = None) -> EnsembleResult:
+    """Return the percentiles of size projections starting at start_level.
+
+    The rate of segment k of every trajectory is drawn from a normal distribution with mean
+    schedule[k].rate and standard deviation rate_spreads[k], and the contribution shares are
+    drawn from a Dirichlet distribution with mean shares. A larger share_concentration makes
+    the shares vary less.
+
+    The work is split over workers processes (os.cpu_count() by default, and none if
+    workers == 1). The same seed always gives the same result.
+
+    Preconditions:
+        - size > 0
+        - len(rate_spreads) == len(schedule)
+        - abs(sum(shares) - 1) < 1e-9
+        - share_concentration > 0
+        - all(0 <= p <= 100 for p in percentiles)
+    """
+    boundaries = schedule_boundaries(schedule)
+    times = time_grid(boundaries[0], boundaries[-1], step)
+    task = _EnsembleTask(start_level, size, seed, boundaries,
+                         np.array([segment.rate for segment in schedule]),
+                         np.array([segment.acceleration for segment in schedule]),
+                         np.asarray(rate_spreads, dtype=np.float64),
+                         np.asarray(shares, dtype=np.float64) * share_concentration,
+                         np.asarray(percentiles, dtype=np.float64))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = [chunk for chunk in np.array_split(times, min(workers, len(times))) if len(chunk)]
+
+    if workers == 1:
+        results = [task.run(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(task.run, chunks))
+
+    return EnsembleResult(times, tuple(float(p) for p in percentiles),
+                          np.concatenate([result[0] for result in results], axis=1),
+                          np.concatenate([result[1] for result in results], axis=2),
+                          size, seed)
+
+
+def sample_parameters(size: int, seed: int, rates: np.ndarray, rate_spreads: np.ndarray,
+                      share_alphas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the sampled segment rates, of shape (size, len(rates)), and the sampled
+    contribution shares, of shape (size, len(share_alphas)), for the given seed.
+    """
+    generator = np.random.default_rng(seed)
+    sampled_rates = generator.normal(rates, rate_spreads, size=(size, len(rates)))
+    sampled_shares = generator.dirichlet(share_alphas, size=size)
+    return sampled_rates, sampled_shares
+
+
+class _EnsembleTask:
+    """The parameters of an ensemble, which can be sent to a worker process to compute the
+    percentiles for some of the times.
+
+    Instance Attributes:
+        - start_level: the global mean sea level every trajectory starts at
+        - size: the number of trajectories
+        - seed: the seed the parameters are sampled from
+        - boundaries: the segment boundaries of the rate schedule
+        - rates: the mean rate of every segment
+        - accelerations: the acceleration of every segment
+        - rate_spreads: the standard deviation of the rate of every segment
+        - share_alphas: the Dirichlet parameters of the contribution shares
+        - percentiles: the percentiles to compute
+    """
+    start_level: float
+    size: int
+    seed: int
+    boundaries: np.ndarray
+    rates: np.ndarray
+    accelerations: np.ndarray
+    rate_spreads: np.ndarray
+    share_alphas: np.ndarray
+    percentiles: np.ndarray
+
+    def __init__(self, start_level: float, size: int, seed: int, boundaries: np.ndarray,
+                 rates: np.ndarray, accelerations: np.ndarray, rate_spreads: np.ndarray,
+                 share_alphas: np.ndarray, percentiles: np.ndarray) -> None:
+        """Initialize a new ensemble task with the specified parameters"""
+        self.start_level = start_level
+        self.size = size
+        self.seed = seed
+        self.boundaries = boundaries
+        self.rates = rates
+        self.accelerations = accelerations
+        self.rate_spreads = rate_spreads
+        self.share_alphas = share_alphas
+        self.percentiles = percentiles
+
+    def run(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the level percentiles, of shape (len(percentiles), len(times)), and the
+        contribution percentiles, of shape (len(shares), len(percentiles), len(times)), of the
+        ensemble at the given times.
+        """
+        rates, shares = sample_parameters(self.size, self.seed, self.rates, self.rate_spreads,
+                                          self.share_alphas)
+        accelerations = np.broadcast_to(self.accelerations, rates.shape)
+        starts = np.full(self.size, self.start_level)
+
+        level_parts: List[np.ndarray] = []
+        contribution_parts: List[np.ndarray] = []
+        batch = max(1, MAX_BATCH_VALUES // self.size)
+        for low in range(0, len(times), batch):
+            levels = project_batch(starts, rates, self.boundaries, times[low:low + batch],
+                                   accelerations)
+            level_parts.append(np.percentile(levels, self.percentiles, axis=0))
+            contribution_parts.append(np.stack([
+                np.percentile(shares[:, [component]] * levels, self.percentiles, axis=0)
+                for component in range(shares.shape[1])]))
+
+        return np.concatenate(level_parts, axis=1), np.concatenate(contribution_parts, axis=2)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['os', 'concurrent.futures', 'numpy', 'typing', 'factors',
+                          'projection'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'R0913', 'R0902']
+    })
@@ -0,0 +1,87 @@
+"""
+This file handles splitting the global mean sea level rise into the factors that cause it.
+
+The rise is split into COMPONENTS by multiplying the levels with the share of every component.
+The shares can be the same for every year, or given at anchor years and linearly interpolated
+in between, since the share of the ice sheets grows late in the century. The levels of every
+year (and of every member of an ensemble) are multiplied with the shares of every scenario in a
+single broadcast, so the result is a years x components array and no Python loop runs per year.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import numpy as np
+
+COMPONENTS = ('ocean heat capacity', 'glaciers', 'ice sheets')
+
+# After performing calculations on Table 13.1, we find that on average, roughly 41% of the
+# global mean sea level rise is a result of thermal expansion due to ocean heat contents, 35% is
+# a result of melting glaciers, and 24% is a result of melting ice sheets (Church et al. 1151).
+DEFAULT_SHARES = np.array([0.41, 0.35, 0.24])
+
+
+def decompose(levels: np.ndarray, shares: np.ndarray = DEFAULT_SHARES) -> np.ndarray:
+    """Return the contribution of every component to the given levels.
+
+    levels has a year on its last axis, and may have leading axes, such as the members of an
+    ensemble. shares is either one share per component, used for every year, or an array of
+    shape (..., len(years), len(COMPONENTS)) from interpolate_shares, whose leading axes (such
+    as share scenarios) are broadcast against the leading axes of levels. The result has the
+    broadcast shape of levels[..., np.newaxis] and shares, so a single series of levels gives a
+    years x components array.
+
+    Preconditions:
+        - shares.shape[-1] == len(COMPONENTS)
+        - shares.ndim == 1 or shares.shape[-2] == levels.shape[-1]
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    shares = np.asarray(shares, dtype=np.float64)
+    return levels[..., np.newaxis] * shares
+
+
+def interpolate_shares(years: np.ndarray, anchor_years: np.ndarray,
+                       anchor_shares: np.ndarray) -> np.ndarray:
+    """Return the share of every component for every year, linearly interpolated between the
+    shares at the anchor years. Years before the first or after the last anchor year keep the
+    shares of that anchor year.
+
+    anchor_shares has shape (..., len(anchor_years), len(COMPONENTS)), where the leading axes
+    are independent share scenarios, and the result has shape
+    (..., len(years), len(COMPONENTS)).
+
+    Raise a ValueError if the anchor years are not in strictly ascending order or do not match
+    anchor_shares.
+
+    Preconditions:
+        - len(anchor_years) > 0
+    """
+    years = np.asarray(years, dtype=np.float64)
+    anchor_years = np.asarray(anchor_years, dtype=np.float64)
+    anchor_shares = np.asarray(anchor_shares, dtype=np.float64)
+    if anchor_shares.ndim < 2 or anchor_shares.shape[-2] != len(anchor_years):
+        raise ValueError(f'expected shares for {len(anchor_years)} anchor years, got an array '
+                         f'of shape {anchor_shares.shape}')
+    if np.any(anchor_years[1:] <= anchor_years[:-1]):
+        raise ValueError('anchor years must be in strictly ascending order')
+    if len(anchor_years) == 1:
+        return np.repeat(anchor_shares, len(years), axis=-2)
+
+    # The anchor interval every year falls in and how far into that interval it is
+    interval = np.clip(np.searchsorted(anchor_years, years, side='right') - 1,
+                       0, len(anchor_years) - 2)
+    weight = np.clip((years - anchor_years[interval])
+                     / (anchor_years[interval + 1] - anchor_years[interval]), 0.0, 1.0)
+    weight = weight[:, np.newaxis]
+    return anchor_shares[..., interval, :] * (1 - weight) \
+        + anchor_shares[..., interval + 1, :] * weight
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['numpy'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,120 @@
+"""
+This file renders still images of every year of every simulation scene without a window.
+
+SDL's dummy video driver is used, so no display is needed. The frames are split over worker
+processes: each worker loads and scales the images once, then composites its frames with the
+same scene layers as the interactive simulation and saves them to disk.
+
+Frames are saved as JPEG by default, since encoding a PNG takes far longer than compositing the
+frame itself; pass image_format='png' for lossless frames.
+
+Usage: python frame_renderer.py [output directory] [number of workers] [image format]
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from scenes import FIRST_YEAR, IMAGE_DIRECTORY, IMAGES, LAST_YEAR, SCENES, SCREENHEIGHT, \
+    SCREENWIDTH
+from sea_level_series import SeaLevelSeries
+from water_offsets import WaterOffsets
+
+DATA_FILE = 'Datasets/global_mean_sea_level.csv'
+
+# The pygame state of a worker process, set up once by _start_worker
+_worker = {}
+
+
+def render_frames(data: Dict[str, float], output_dir: str,
+                  scene_names: Optional[Sequence[str]] = None,
+                  years: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                  image_dir: str = IMAGE_DIRECTORY, image_format: str = 'jpg') -> List[str]:
+    """Render the given scenes (every scene by default) for the given years (1993 to 2100 by
+    default) from data, a dictionary mapping years to global mean sea levels like the one
+    returned by combine_data, and return the paths of the saved frames.
+
+    Frames are saved as <output_dir>/<scene name>_<year>.<image_format>, where image_format
+    is any extension pygame.image.save supports, such as 'jpg', 'png', 'bmp' or 'tga'.
+
+    Preconditions:
+        - all(name in SCENES for name in scene_names)
+        - all(str(year) in data for year in years)
+    """
+    if scene_names is None:
+        scene_names = list(SCENES)
+    if years is None:
+        years = range(FIRST_YEAR, LAST_YEAR + 1)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(name, year, os.path.join(output_dir, f'{name}_{year}.{image_format}'))
+             for name in scene_names for year in years]
+    water_offsets = WaterOffsets.from_series(SeaLevelSeries.from_dict(data))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                             initargs=(image_dir, water_offsets)) as executor:
+        return list(executor.map(_render_frame, tasks, chunksize=chunksize))
+
+
+def _start_worker(image_dir: str, water_offsets: WaterOffsets) -> None:
+    """Initialize pygame without a display and load every image in this worker process."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    import pygame
+    from assets import AssetManager
+    from scene_engine import composite, is_opaque, scene_layers
+    from text_cache import TextCache
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))
+
+    assets = AssetManager(image_dir)
+    images = {name: assets.load_image(name) for name in IMAGES}
+
+    _worker['pygame'] = pygame
+    _worker['composite'] = composite
+    _worker['scene_layers'] = scene_layers
+    _worker['images'] = images
+    _worker['water_offsets'] = water_offsets
+    _worker['opaque'] = {name: is_opaque(image) for name, image in images.items()}
+    _worker['origins'] = {name: assets.origin(name) for name in images}
+    _worker['text_cache'] = TextCache()
+    _worker['font'] = pygame.font.SysFont('arial', 30)
+    _worker['caption_font'] = pygame.font.SysFont('arial', 15)
+    _worker['surface'] = pygame.Surface((SCREENWIDTH, SCREENHEIGHT))
+
+
+def _render_frame(task: Tuple[str, int, str]) -> str:
+    """Composite the frame of the given (scene name, year, path) task, save it and return its
+    path.
+    """
+    name, year, path = task
+    surface = _worker['surface']
+
+    layers = _worker['scene_layers'](SCENES[name], _worker['images'], _worker['opaque'], year,
+                                     _worker['water_offsets'].offset(name, year),
+                                     _worker['text_cache'], _worker['font'],
+                                     _worker['caption_font'], _worker['origins'])
+    _worker['composite'](surface, layers, surface.get_rect())
+
+    _worker['pygame'].image.save(surface, path)
+    return path
+
+
+if __name__ == '__main__':
+    from computations import load_combined_data
+
+    arguments = sys.argv[1:]
+    frames = render_frames(load_combined_data(DATA_FILE),
+                           arguments[0] if len(arguments) > 0 else 'frames',
+                           workers=int(arguments[1]) if len(arguments) > 1 else None,
+                           image_format=arguments[2] if len(arguments) > 2 else 'jpg')
+    print(f'rendered {len(frames)} frames')
@@ -0,0 +1,140 @@
+"""
+This file measures how long every phase of a simulation frame takes.
+
+A FrameTimer splits every frame into phases (polling events, updating the year and the water,
+rendering text, blitting, flipping the display and waiting for the clock) and keeps the time
+of each phase for the last frames in a fixed size ring buffer, so recording never allocates.
+The rolling 50th, 95th and 99th percentiles can be shown over the simulation and the recorded
+frames can be written to a csv file. While the timer is off, marking a phase only checks a flag.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import csv
+import time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+PHASES = ('events', 'update', 'text', 'blits', 'flip', 'tick')
+DEFAULT_CAPACITY = 1000
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+class FrameTimer:
+    """Records the time taken by every phase of the last frames.
+
+    Instance Attributes:
+        - enabled: whether frames are being recorded
+        - capacity: the number of frames kept, after which the oldest frames are overwritten
+        - frames: the number of frames recorded since the timer was created
+
+    Representation Invariants:
+        - self.capacity > 0
+        - self.frames >= 0
+    """
+    enabled: bool
+    capacity: int
+    frames: int
+    # Private Instance Attributes:
+    #   - _samples: the seconds taken by every phase of the kept frames, with a row per frame
+    #   - _current: the seconds taken by every phase of the current frame so far
+    #   - _indices: the column of _samples of every phase
+    #   - _last: the time the last phase ended, from time.perf_counter
+    _samples: np.ndarray
+    _current: List[float]
+    _indices: Dict[str, int]
+    _last: float
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = False) -> None:
+        """Initialize a new frame timer keeping the last capacity frames.
+
+        Preconditions:
+            - capacity > 0
+        """
+        self.enabled = False
+        self.capacity = capacity
+        self.frames = 0
+        self._samples = np.zeros((capacity, len(PHASES)), dtype=np.float64)
+        self._current = [0.0] * len(PHASES)
+        self._indices = {phase: i for i, phase in enumerate(PHASES)}
+        self._last = 0.0
+        if enabled:
+            self.toggle()
+
+    def toggle(self) -> None:
+        """Start recording if the timer is off, and stop recording otherwise."""
+        self.enabled = not self.enabled
+        self._current = [0.0] * len(PHASES)
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Add the time since the end of the previous phase to the given phase of the current
+        frame.
+
+        Preconditions:
+            - phase in PHASES
+        """
+        if self.enabled:
+            now = time.perf_counter()
+            self._current[self._indices[phase]] += now - self._last
+            self._last = now
+
+    def end_frame(self) -> None:
+        """Store the phases of the current frame and start the next frame."""
+        if self.enabled:
+            self._samples[self.frames % self.capacity] = self._current
+            self._current = [0.0] * len(PHASES)
+            self.frames += 1
+
+    def samples(self) -> np.ndarray:
+        """Return the seconds taken by every phase of the kept frames, from the oldest to the
+        newest frame, with a row per frame and a column per phase of PHASES.
+        """
+        if self.frames <= self.capacity:
+            return self._samples[:self.frames].copy()
+        start = self.frames % self.capacity
+        return np.concatenate((self._samples[start:], self._samples[:start]))
+
+    def percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) \
+            -> Dict[str, Tuple[float, ...]]:
+        """Return the given percentiles of the milliseconds taken by every phase (and by the
+        whole frame, as 'total') over the kept frames.
+
+        Return an empty dictionary if no frame has been recorded.
+        """
+        if self.frames == 0:
+            return {}
+        samples = self.samples() * 1000
+        columns = dict(zip(PHASES, samples.T))
+        columns['total'] = samples.sum(axis=1)
+        return {phase: tuple(np.percentile(values, percentiles).tolist())
+                for phase, values in columns.items()}
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[str]:
+        """Return a line of text for every phase with its percentiles, in milliseconds."""
+        lines = []
+        for phase, values in self.percentiles(percentiles).items():
+            columns = '  '.join(f'p{p:g} {value:6.2f}' for p, value in zip(percentiles, values))
+            lines.append(f'{phase:<7}{columns} ms')
+        return lines
+
+    def write_csv(self, filename: str) -> None:
+        """Write the milliseconds taken by every phase of the kept frames to a csv file, with a
+        row per frame from the oldest to the newest.
+        """
+        first_frame = self.frames - min(self.frames, self.capacity)
+        with open(filename, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('frame',) + PHASES)
+            for i, row in enumerate((self.samples() * 1000).tolist()):
+                writer.writerow([first_frame + i] + [round(value, 4) for value in row])
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['csv', 'time', 'typing', 'numpy'],
+        'allowed-io': ['write_csv'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,194 @@
+"""
+This file handles the on-disk cache of the parsed global mean sea level csv file.
+
+The first time a csv file is loaded, its parsed rows and its yearly averages are written to
+binary .npy files in a cache directory. Later loads memory-map those files instead of parsing
+the csv file again, so the arrays are available without copying them into memory.
+
+Every cache entry is keyed by the fingerprint of its source file: the size, the modification
+time and the SHA-256 hash of its contents. If the size or the modification time changed, the
+hash is computed again, and if the contents changed, the cache entry is rebuilt.
+
+If the cache directory cannot be written to (for example, the csv file is in a read-only
+directory), the csv file is parsed every time, as if there were no cache.
+
+read_csv and mean_sea_level_change in computations.py are not cached, since they take and return
+dictionaries; the program loads its data through load_annual_means (in load_combined_data and
+load_cached_data) instead.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+from aggregation import aggregate
+from gmsl_reader import read_series
+from sea_level_series import SeaLevelSeries
+
+CACHE_DIRECTORY_NAME = '.gmsl_cache'
+INDEX_FILENAME = 'index.json'
+CACHE_FORMAT_VERSION = 2
+
+
+def load_series(filename: str, cache_dir: Optional[str] = None) -> SeaLevelSeries:
+    """Return the parsed rows of the given csv file, loading them from the cache if possible.
+
+    The returned series is a read-only view of the memory-mapped cache file.
+    """
+    return _load(filename, cache_dir)[0]
+
+
+def load_annual_means(filename: str, cache_dir: Optional[str] = None) -> SeaLevelSeries:
+    """Return the yearly average global mean sea levels of the given csv file, like
+    mean_sea_level_change (without rounding), loading them from the cache if possible.
+    """
+    return _load(filename, cache_dir)[1]
+
+
+def source_hash(filename: str, cache_dir: Optional[str] = None) -> str:
+    """Return the SHA-256 hash of the contents of the given csv file, taken from the cache
+    index if the size and the modification time of the file did not change.
+    """
+    if cache_dir is None:
+        cache_dir = _default_cache_dir(filename)
+    entry = _read_index(cache_dir).get(os.path.abspath(filename))
+    stat = os.stat(filename)
+    if entry is not None and entry['size'] == stat.st_size \
+            and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+    return _file_hash(filename)
+
+
+def fingerprint(filename: str) -> Dict[str, object]:
+    """Return the size, modification time and SHA-256 hash of the given file."""
+    stat = os.stat(filename)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_hash(filename)}
+
+
+def _load(filename: str, cache_dir: Optional[str]) -> Tuple[SeaLevelSeries, SeaLevelSeries]:
+    """Return the parsed and the yearly averaged series of the given csv file, rebuilding the
+    cache entry if it is missing or out of date.
+    """
+    if cache_dir is None:
+        cache_dir = _default_cache_dir(filename)
+    source = os.path.abspath(filename)
+    index = _read_index(cache_dir)
+    entry = index.get(source)
+
+    stat = os.stat(filename)
+    if entry is not None and entry['size'] == stat.st_size \
+            and entry['mtime_ns'] == stat.st_mtime_ns:
+        loaded = _read_entry(cache_dir, entry['sha256'])
+        if loaded is not None:
+            return loaded
+
+    new_entry = fingerprint(filename)
+    loaded = _read_entry(cache_dir, new_entry['sha256'])
+    if loaded is None:
+        series = read_series(filename)
+        annual = aggregate(series, 'year', 'mean', decimals=2)
+        try:
+            _write_array(cache_dir, new_entry['sha256'], 'raw', series)
+            _write_array(cache_dir, new_entry['sha256'], 'annual', annual)
+        except OSError:
+            # the cache directory cannot be written to, so the parsed series are used as is
+            return series, annual
+        loaded = _read_entry(cache_dir, new_entry['sha256'])
+        if loaded is None:
+            return series, annual
+
+    index[source] = new_entry
+    if entry is not None and entry['sha256'] != new_entry['sha256']:
+        _remove_unused(cache_dir, entry['sha256'], index)
+    try:
+        _write_index(cache_dir, index)
+    except OSError:
+        pass
+
+    return loaded
+
+
+def _default_cache_dir(filename: str) -> str:
+    """Return the cache directory next to the given csv file."""
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIRECTORY_NAME)
+
+
+def _file_hash(filename: str) -> str:
+    """Return the SHA-256 hash of the contents of the given file."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir: str, sha256: str, kind: str) -> str:
+    """Return the path of the cache file of the given kind for the given content hash."""
+    return os.path.join(cache_dir, f'{sha256}.v{CACHE_FORMAT_VERSION}.{kind}.npy')
+
+
+def _read_entry(cache_dir: str, sha256: str) -> Optional[Tuple[SeaLevelSeries, SeaLevelSeries]]:
+    """Return the memory-mapped parsed and yearly series for the given content hash, or None if
+    they are not in the cache.
+    """
+    arrays = []
+    for kind in ('raw', 'annual'):
+        try:
+            arrays.append(np.load(_entry_path(cache_dir, sha256, kind), mmap_mode='r'))
+        except (OSError, ValueError):
+            return None
+    return SeaLevelSeries(arrays[0][0], arrays[0][1]), SeaLevelSeries(arrays[1][0], arrays[1][1])
+
+
+def _write_array(cache_dir: str, sha256: str, kind: str, series: SeaLevelSeries) -> None:
+    """Write the given series to the cache as a 2 x n array of times and values."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(cache_dir, sha256, kind)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        np.save(file, np.stack((series.times, series.values)))
+    os.replace(temporary, path)
+
+
+def _remove_unused(cache_dir: str, sha256: str, index: Dict[str, dict]) -> None:
+    """Delete the cache files of the given content hash if no source file uses them anymore."""
+    if any(entry['sha256'] == sha256 for entry in index.values()):
+        return
+    for kind in ('raw', 'annual'):
+        try:
+            os.remove(_entry_path(cache_dir, sha256, kind))
+        except OSError:
+            pass
+
+
+def _read_index(cache_dir: str) -> Dict[str, dict]:
+    """Return the mapping from source files to their fingerprints stored in the cache."""
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILENAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(cache_dir: str, index: Dict[str, dict]) -> None:
+    """Replace the index of the cache with the given mapping."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, INDEX_FILENAME)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(index, file, indent=2)
+    os.replace(temporary, path)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['hashlib', 'json', 'os', 'numpy', 'typing', 'aggregation',
+                          'gmsl_reader', 'sea_level_series'],
+        'allowed-io': ['_file_hash', '_write_array', '_read_index', '_write_index'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,96 @@
+"""
+This file generates synthetic global mean sea level csv files of any size.
+
+The files have the layout read_csv and the block reader expect: 8 header rows, then rows whose
+first column is the time in decimal years and whose next four columns are global mean sea
+levels in mm. The levels follow a linear trend with a yearly cycle and random noise, and every
+value column can be left blank with its own probability, so the files exercise the fallback
+from row[4] to row[3], row[2] and row[1]. No row is blank in every value column, since read_csv
+cannot read such a row.
+
+Rows are generated and written in chunks, so files much larger than the memory can be written.
+The same arguments (including the seed) always generate the same file, whatever the chunk size.
+
+Usage: python gmsl_generator.py [output file] [number of rows] [samples per year] [seed]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import math
+import sys
+from typing import Sequence
+import numpy as np
+from gmsl_reader import HEADER_ROWS, VALUE_COLUMNS
+
+DEFAULT_FILE = 'synthetic_global_mean_sea_level.csv'
+DEFAULT_ROWS = 1000
+# The altimetry data is sampled about every 10 days
+DEFAULT_SAMPLES_PER_YEAR = 36.5
+DEFAULT_START_YEAR = 1993.0
+# The probability that each value column, from row[1] to row[4], is blank
+DEFAULT_BLANK_PROBABILITIES = (0.05, 0.2, 0.3, 0.5)
+DEFAULT_TREND = 3.3
+DEFAULT_NOISE = 5.0
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def generate_csv(filename: str, rows: int = DEFAULT_ROWS, seed: int = 0,
+                 samples_per_year: float = DEFAULT_SAMPLES_PER_YEAR,
+                 start_year: float = DEFAULT_START_YEAR,
+                 blank_probabilities: Sequence[float] = DEFAULT_BLANK_PROBABILITIES,
+                 trend: float = DEFAULT_TREND, noise: float = DEFAULT_NOISE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Write a synthetic global mean sea level csv file with the given number of rows, sampled
+    samples_per_year times a year from start_year.
+
+    The level rises by trend mm per year, plus a yearly cycle and normally distributed noise
+    with a standard deviation of noise mm. blank_probabilities[i] is the probability that
+    row[i + 1] is blank; a row that would be blank in every value column keeps row[1].
+
+    Preconditions:
+        - rows >= 0
+        - samples_per_year > 0
+        - len(blank_probabilities) == 4
+        - all(0 <= probability <= 1 for probability in blank_probabilities)
+        - chunk_size > 0
+    """
+    if len(blank_probabilities) != VALUE_COLUMNS:
+        raise ValueError(f'expected {VALUE_COLUMNS} blank probabilities, '
+                         f'got {len(blank_probabilities)}')
+
+    # Separate streams for the noise and the blanks, so the file does not depend on chunk_size
+    noise_rng, blank_rng = (np.random.default_rng(sequence)
+                            for sequence in np.random.SeedSequence(seed).spawn(2))
+    # Enough decimals to tell every time apart
+    decimals = max(4, math.ceil(math.log10(samples_per_year)) + 2)
+    # Every value column is a slightly different estimate of the same level
+    column_offsets = np.linspace(-2.0, 2.0, VALUE_COLUMNS)
+
+    with open(filename, 'w', newline='') as file:
+        file.writelines(f'HDR synthetic global mean sea level, header row {i + 1}\n'
+                        for i in range(HEADER_ROWS))
+
+        for start in range(0, rows, chunk_size):
+            count = min(chunk_size, rows - start)
+            times = start_year + np.arange(start, start + count) / samples_per_year
+            elapsed = times - start_year
+            levels = trend * elapsed + 4.0 * np.sin(2 * np.pi * elapsed)
+            values = levels[:, np.newaxis] + column_offsets \
+                + noise_rng.normal(0.0, noise, (count, VALUE_COLUMNS))
+
+            blank = blank_rng.random((count, VALUE_COLUMNS)) < np.asarray(blank_probabilities)
+            blank[blank.all(axis=1), 0] = False
+
+            cells = np.char.mod('%.2f', values)
+            cells[blank] = ''
+            time_cells = np.char.mod(f'%.{decimals}f', times)
+            file.writelines(f'{time_},{",".join(row)}\n'
+                            for time_, row in zip(time_cells.tolist(), cells.tolist()))
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    generate_csv(arguments[0] if len(arguments) > 0 else DEFAULT_FILE,
+                 int(float(arguments[1])) if len(arguments) > 1 else DEFAULT_ROWS,
+                 int(arguments[3]) if len(arguments) > 3 else 0,
+                 float(arguments[2]) if len(arguments) > 2 else DEFAULT_SAMPLES_PER_YEAR)
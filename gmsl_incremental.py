@@ -0,0 +1,299 @@
+"""
+This file handles reading a global mean sea level csv file that grows by appended rows.
+
+Instead of parsing the whole file on every load, an IncrementalReader keeps a JSON checkpoint
+next to the file with the byte offset it has read up to, the last time it has seen and the
+state of the yearly averages: the averages of the years that are complete, and the sum and
+number of values of the year that is still being appended to. A refresh only parses the
+complete lines after the offset, so its cost depends on the size of the new rows and not on
+the size of the file. A line that is still being written (without its newline) is left for the
+next refresh.
+
+The projections only depend on the average of the year they start from, so they are only
+computed again when that average changes.
+
+If the file was rewritten instead of appended to (it is shorter than the offset, the bytes just
+before the offset changed, or a new row is not later than the rows already read), the whole
+file is read again.
+
+All the corresponding global mean sea level values are in mm.
+
+Usage: python gmsl_incremental.py [csv file]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from aggregation import aggregate
+from computations import combine_data, predict_2021_2080, predict_2081_2100
+from gmsl_cache import CACHE_DIRECTORY_NAME
+from gmsl_reader import DEFAULT_BLOCK_SIZE, HEADER_ROWS, iter_row_blocks, series_from_blocks
+from sea_level_series import SeaLevelSeries
+
+CHECKPOINT_FORMAT_VERSION = 2
+# The number of bytes before the offset that are hashed to notice a rewritten file
+TAIL_BYTES = 4096
+
+
+class IncrementalReader:
+    """Reads the rows appended to a global mean sea level csv file since the last refresh.
+
+    Instance Attributes:
+        - filename: the path of the csv file
+        - checkpoint_file: the path of the JSON checkpoint of the csv file
+        - offset: the number of bytes of the csv file that have been read
+        - last_time: the time of the last row that has been read, or None if no row has
+        - rows: the number of rows that have been read
+        - year_means: the yearly average of every complete year, by year
+        - partial_year: the year of the last row that has been read, or None if no row has
+        - partial_sum: the sum of the values of partial_year, added in the order they were read
+        - partial_count: the number of values of partial_year
+
+    Representation Invariants:
+        - self.offset >= 0
+        - all(year < self.partial_year for year in self.year_means)
+        - (self.partial_year is None) == (self.rows == 0)
+    """
+    filename: str
+    checkpoint_file: str
+    offset: int
+    last_time: Optional[float]
+    rows: int
+    year_means: Dict[int, float]
+    partial_year: Optional[int]
+    partial_sum: float
+    partial_count: int
+    # Private Instance Attributes:
+    #   - _tail: the SHA-256 hash of the TAIL_BYTES bytes of the csv file before offset
+    #   - _projections: the level the projections start from and the projected years
+    _tail: str
+    _projections: Optional[Tuple[float, Dict[str, float]]]
+
+    def __init__(self, filename: str, checkpoint_file: Optional[str] = None) -> None:
+        """Initialize a new reader of the given csv file, continuing from its checkpoint if it
+        has one.
+
+        The checkpoint is kept in the cache directory next to the csv file by default.
+        """
+        if checkpoint_file is None:
+            directory, name = os.path.split(os.path.abspath(filename))
+            checkpoint_file = os.path.join(directory, CACHE_DIRECTORY_NAME,
+                                           f'{name}.checkpoint.json')
+        self.filename = filename
+        self.checkpoint_file = checkpoint_file
+        self._projections = None
+        if not self._read_checkpoint():
+            self._reset()
+
+    def refresh(self, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+        """Read the complete rows appended to the csv file since the last refresh, update the
+        yearly averages and save the checkpoint. Return the number of new rows.
+
+        The whole file is read again if it was not only appended to.
+        """
+        with open(self.filename, 'rb') as file:
+            if not self._is_appended(file):
+                self._reset()
+            file.seek(self.offset)
+            consumed = [0]
+            blocks = list(iter_row_blocks(self._new_rows(file, consumed), block_size))
+
+            if self.offset == 0 or self._is_ordered(blocks):
+                added = self._add_blocks(blocks)
+            else:
+                self._reset()
+                file.seek(0)
+                consumed = [0]
+                added = self._add_blocks(list(iter_row_blocks(self._new_rows(file, consumed),
+                                                              block_size)))
+            self.offset += consumed[0]
+            self._tail = _tail_hash(file, self.offset)
+
+        self._write_checkpoint()
+        return added
+
+    def annual_means(self) -> SeaLevelSeries:
+        """Return the yearly average global mean sea levels of the rows read so far, like
+        load_annual_means in gmsl_cache.py.
+        """
+        years = sorted(self.year_means)
+        values = [self.year_means[year] for year in years]
+        if self.partial_year is not None:
+            years.append(self.partial_year)
+            values.append(self.partial_sum / self.partial_count)
+        return SeaLevelSeries(np.array(years, dtype=np.float64), np.array(values))
+
+    def combined_data(self) -> Dict[str, float]:
+        """Return the yearly averages of the rows read so far followed by the predictions, like
+        load_combined_data in computations.py.
+
+        The predictions are only computed again if the 2020 average changed since the last
+        call. Raise a KeyError if no row of 2020 has been read.
+        """
+        data = self.annual_means().to_dict(decimals=2)
+        if self._projections is None or self._projections[0] != data['2020']:
+            data_2021_2080 = predict_2021_2080(data['2020'])
+            data_2081_2100 = predict_2081_2100(data_2021_2080['2080'])
+            self._projections = (data['2020'], combine_data(data_2021_2080, data_2081_2100, {}))
+        data.update(self._projections[1])
+        return data
+
+    def _reset(self) -> None:
+        """Forget every row read so far, so the next refresh reads the whole file."""
+        self.offset = 0
+        self.last_time = None
+        self.rows = 0
+        self.year_means = {}
+        self.partial_year = None
+        self.partial_sum = 0.0
+        self.partial_count = 0
+        self._tail = _tail_hash(None, 0)
+
+    def _is_appended(self, file: BinaryIO) -> bool:
+        """Return whether the bytes of file read so far are still the same."""
+        return os.fstat(file.fileno()).st_size >= self.offset \
+            and _tail_hash(file, self.offset) == self._tail
+
+    def _is_ordered(self, blocks: List[Tuple[np.ndarray, np.ndarray]]) -> bool:
+        """Return whether the times of the given blocks are strictly ascending and after
+        every time read so far.
+        """
+        previous = -np.inf if self.last_time is None else self.last_time
+        for times, _ in blocks:
+            if times[0] <= previous or np.any(times[1:] <= times[:-1]):
+                return False
+            previous = times[-1]
+        return True
+
+    def _new_rows(self, file: BinaryIO, consumed: List[int]) -> Iterator[List[str]]:
+        """Return the csv rows of the complete lines of file after its current position,
+        skipping the header rows if the file is read from the start.
+
+        The number of bytes of the lines that are read is added to consumed[0].
+        """
+        lines = _complete_lines(file, consumed)
+        if self.offset == 0:
+            header = [line for _, line in zip(range(HEADER_ROWS), lines)]
+            if len(header) < HEADER_ROWS:
+                # wait until the whole header has been written
+                consumed[0] = 0
+                return iter([])
+        return csv.reader(lines)
+
+    def _add_blocks(self, blocks: List[Tuple[np.ndarray, np.ndarray]]) -> int:
+        """Add the rows of the given blocks, which come after every row read so far, to the
+        yearly averages. Return the number of rows added.
+        """
+        series = series_from_blocks(blocks)
+        if len(series) == 0:
+            return 0
+
+        binned = aggregate(series, 'year', 'count')
+        years = binned.years.tolist()
+        counts = binned.values.astype(np.int64).tolist()
+        bounds = np.cumsum([0] + counts).tolist()
+        values = series.values.tolist()
+        # every year is added up in order, like mean_sea_level_change does, so its rounded
+        # average is the same even where it is within a rounding error of a tie
+        sums = [sum(values[bounds[i]:bounds[i + 1]]) for i in range(len(years))]
+        if years[0] == self.partial_year:
+            sums[0] = sum(values[:bounds[1]], self.partial_sum)
+            counts[0] += self.partial_count
+        elif self.partial_year is not None:
+            self.year_means[self.partial_year] = self.partial_sum / self.partial_count
+        for year, total, count in zip(years[:-1], sums, counts):
+            self.year_means[year] = total / count
+
+        self.partial_year = years[-1]
+        self.partial_sum = sums[-1]
+        self.partial_count = counts[-1]
+        self.last_time = float(series.times[-1])
+        self.rows += len(series)
+        return len(series)
+
+    def _read_checkpoint(self) -> bool:
+        """Load the state of the checkpoint file. Return whether it could be loaded."""
+        try:
+            with open(self.checkpoint_file) as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if checkpoint.get('version') != CHECKPOINT_FORMAT_VERSION \
+                or checkpoint.get('source') != os.path.abspath(self.filename):
+            return False
+
+        self.offset = checkpoint['offset']
+        self.last_time = checkpoint['last_time']
+        self.rows = checkpoint['rows']
+        self.year_means = {int(year): mean for year, mean in checkpoint['year_means'].items()}
+        partial = checkpoint['partial_year']
+        self.partial_year = partial['year']
+        self.partial_sum = partial['sum']
+        self.partial_count = partial['count']
+        self._tail = checkpoint['tail_sha256']
+        return True
+
+    def _write_checkpoint(self) -> None:
+        """Replace the checkpoint file with the current state."""
+        checkpoint = {
+            'version': CHECKPOINT_FORMAT_VERSION,
+            'source': os.path.abspath(self.filename),
+            'offset': self.offset,
+            'tail_sha256': self._tail,
+            'last_time': self.last_time,
+            'rows': self.rows,
+            'year_means': {str(year): mean for year, mean in sorted(self.year_means.items())},
+            'partial_year': {'year': self.partial_year, 'sum': self.partial_sum,
+                             'count': self.partial_count}
+        }
+        directory = os.path.dirname(self.checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f'{self.checkpoint_file}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(checkpoint, file, indent=2)
+        os.replace(temporary, self.checkpoint_file)
+
+
+def _complete_lines(file: BinaryIO, consumed: List[int]) -> Iterator[str]:
+    """Yield the lines of file from its current position up to the last newline, adding the
+    number of bytes of every yielded line to consumed[0].
+    """
+    for line in file:
+        if not line.endswith(b'\n'):
+            return
+        consumed[0] += len(line)
+        yield line.decode()
+
+
+def _tail_hash(file: Optional[BinaryIO], offset: int) -> str:
+    """Return the SHA-256 hash of the TAIL_BYTES bytes of file before offset."""
+    start = max(0, offset - TAIL_BYTES)
+    data = b''
+    if file is not None:
+        file.seek(start)
+        data = file.read(offset - start)
+    return hashlib.sha256(data).hexdigest()
+
+
+if __name__ == '__main__':
+    reader = IncrementalReader(sys.argv[1] if len(sys.argv) > 1
+                               else 'Datasets/global_mean_sea_level.csv')
+    print(f'{reader.refresh()} new rows, {reader.rows} rows in total')
+    print(reader.combined_data())
+
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['csv', 'hashlib', 'json', 'os', 'sys', 'typing', 'numpy',
+                          'aggregation', 'computations', 'gmsl_cache', 'gmsl_reader',
+                          'sea_level_series'],
+        'allowed-io': ['refresh', '_read_checkpoint', '_write_checkpoint', '_tail_hash'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'R0902']
+    })
@@ -0,0 +1,138 @@
+"""
+This file handles streaming the global mean sea level csv file in fixed-size blocks.
+
+Unlike read_csv in computations.py, which builds one dictionary entry per row, the functions in
+this file parse the file into NumPy blocks of at most block_size rows, so files of any size can
+be processed in bounded memory.
+
+The layout is the same one read_csv expects: 8 header rows, then rows whose first column is the
+time (in decimal years) and whose next four columns are global mean sea level values in mm. The
+value of a row is the last of those four columns that is not blank, exactly like read_csv.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import csv
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+import numpy as np
+from sea_level_series import SeaLevelSeries
+
+HEADER_ROWS = 8
+VALUE_COLUMNS = 4
+DEFAULT_BLOCK_SIZE = 65536
+
+
+def iter_csv_blocks(filename: str, block_size: int = DEFAULT_BLOCK_SIZE) \
+        -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (times, values) pairs of float64 arrays holding at most block_size rows of the
+    given csv file each.
+
+    Only one block is held in memory at a time.
+
+    Preconditions:
+        - block_size > 0
+    """
+    with open(filename, newline='') as file:
+        reader = csv.reader(file)
+
+        for _ in range(0, HEADER_ROWS):  # skip over the first 8 rows
+            next(reader)
+
+        yield from iter_row_blocks(reader, block_size)
+
+
+def iter_row_blocks(rows: Iterable[List[str]], block_size: int = DEFAULT_BLOCK_SIZE) \
+        -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (times, values) blocks parsed from the given csv rows, which must not include the
+    header rows.
+    """
+    rows = iter(rows)
+    while True:
+        times, values = parse_block(islice(rows, block_size))
+        if len(times) == 0:
+            return
+        yield times, values
+
+
+def parse_block(rows: Iterable[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the times and the coalesced values of the given csv rows as float64 arrays.
+
+    The rows are converted one at a time straight into a flat array, so the rows of a block
+    are never all held in memory as lists.
+
+    Raise a ValueError if a row has fewer than 5 columns, a cell is not a number, or every value
+    column of a row is blank (read_csv would fail to convert the blank row[1] as well).
+    """
+    try:
+        cells = np.fromiter(_time_values(rows), dtype=np.float64).reshape(-1, 2)
+    except ValueError as error:
+        raise ValueError(f'malformed global mean sea level rows: {error}') from None
+
+    times, values = cells[:, 0].copy(), cells[:, 1].copy()
+    if np.isnan(values).any():
+        raise ValueError('global mean sea level row with every value column blank')
+
+    return times, values
+
+
+def _time_values(rows: Iterable[List[str]]) -> Iterator[float]:
+    """Yield the time and the value of every row as floats, where a blank time is NaN.
+
+    The value is the last of the value columns that is not blank, which is the same precedence
+    read_csv uses: row[4], then row[3], then row[2], then row[1]. It is NaN if they are all
+    blank.
+    """
+    width = VALUE_COLUMNS + 1
+    nan = float('nan')
+    for row in rows:
+        if len(row) < width:
+            raise ValueError(f'every global mean sea level row needs {width} columns')
+        yield float(row[0]) if row[0] else nan
+        for cell in row[width - 1:0:-1]:
+            if cell:
+                yield float(cell)
+                break
+        else:
+            yield nan
+
+
+def read_series(filename: str, block_size: int = DEFAULT_BLOCK_SIZE) -> SeaLevelSeries:
+    """Return the whole csv file as a SeaLevelSeries, reading it block by block.
+
+    Like read_csv, a later row replaces an earlier row with the same time.
+    """
+    return series_from_blocks(list(iter_csv_blocks(filename, block_size)))
+
+
+def series_from_blocks(blocks: List[Tuple[np.ndarray, np.ndarray]]) -> SeaLevelSeries:
+    """Return the (times, values) blocks of a csv file joined into a SeaLevelSeries.
+
+    Like read_csv, a later row replaces an earlier row with the same time. The list of blocks
+    is emptied, so the blocks are freed once they are joined.
+    """
+    if not blocks:
+        return SeaLevelSeries(np.empty(0), np.empty(0))
+
+    times = np.concatenate([block[0] for block in blocks])
+    values = np.concatenate([block[1] for block in blocks])
+    blocks.clear()
+
+    if len(times) > 1 and not np.all(times[1:] > times[:-1]):
+        # keep the last row of every time, like repeated dictionary assignment
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+        last = np.append(times[1:] != times[:-1], True)
+        times, values = times[last], values[last]
+
+    return SeaLevelSeries(times, values)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['csv', 'itertools', 'numpy', 'typing', 'sea_level_series'],
+        'allowed-io': ['iter_csv_blocks'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,152 @@
+"""
+This file measures how many requests per second the JSON query service answers.
+
+A number of connections are opened to the service and every connection sends its next request
+as soon as the answer to the previous one arrived, cycling through a mix of single year and
+year range queries of every path. The time from sending every request to receiving its whole
+answer is recorded, and the number of requests per second and the percentiles of those times
+are printed.
+
+If no port is given, the service is started in a child process on a free port, so it runs on
+its own core, and stopped at the end.
+
+Usage: python load_generator.py [number of requests] [connections] [port] [host]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sea_level_service import DEFAULT_HOST
+
+DEFAULT_REQUESTS = 20000
+DEFAULT_CONNECTIONS = 16
+DEFAULT_PERCENTILES = (50, 90, 99)
+# The seconds to wait for a service started by the load generator to accept connections
+STARTUP_TIMEOUT = 30.0
+QUERIES = ('/gmsl?year=2050', '/factors?year=2000', '/scaled?year=2100',
+           '/gmsl?start=2020&end=2040', '/factors?start=1993&end=2100',
+           '/scaled?scene=venice,new_york&start=2080&end=2100')
+
+
+async def generate_load(host: str, port: int, requests: int = DEFAULT_REQUESTS,
+                        connections: int = DEFAULT_CONNECTIONS,
+                        queries: Sequence[str] = QUERIES) -> Dict[str, float]:
+    """Send the given number of requests over the given number of connections, and return the
+    number of requests per second, the number of answers that were not successful and the
+    percentiles of the latencies in milliseconds.
+
+    Preconditions:
+        - requests > 0
+        - connections > 0
+    """
+    latencies = np.zeros(requests)
+    failures = [0]
+    next_request = [0]
+
+    async def connection() -> None:
+        """Send requests over one connection until every request has been sent."""
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while next_request[0] < requests:
+                index = next_request[0]
+                next_request[0] += 1
+                target = queries[index % len(queries)]
+                start = time.perf_counter()
+                writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = _content_length(head)
+                await reader.readexactly(length)
+                latencies[index] = time.perf_counter() - start
+                if not head.startswith(b'HTTP/1.1 200'):
+                    failures[0] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    report = {'requests': requests, 'connections': connections, 'seconds': elapsed,
+              'requests_per_second': requests / elapsed, 'failures': failures[0]}
+    for percentile, value in zip(DEFAULT_PERCENTILES,
+                                 np.percentile(latencies * 1000, DEFAULT_PERCENTILES).tolist()):
+        report[f'p{percentile}_ms'] = value
+    report['max_ms'] = float(latencies.max() * 1000)
+    return report
+
+
+def start_service(host: str = DEFAULT_HOST) -> Tuple[subprocess.Popen, int]:
+    """Start the query service in a child process on a free port, and return the process and
+    the port once it accepts connections.
+    """
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        port = probe.getsockname()[1]
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sea_level_service.py')
+    process = subprocess.Popen([sys.executable, script, str(port), host],
+                               stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1.0).close()
+            return process, port
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError('the sea level service did not start') from None
+            time.sleep(0.05)
+
+
+def format_report(report: Dict[str, float]) -> List[str]:
+    """Return the lines of text describing the given load report."""
+    percentiles = '  '.join(f'p{percentile} {report[f"p{percentile}_ms"]:.2f} ms'
+                            for percentile in DEFAULT_PERCENTILES)
+    return [f'{report["requests"]} requests over {report["connections"]} connections '
+            f'in {report["seconds"]:.2f} s, {report["failures"]} failed',
+            f'{report["requests_per_second"]:,.0f} requests/s',
+            f'latency {percentiles}  max {report["max_ms"]:.2f} ms']
+
+
+def main(requests: int = DEFAULT_REQUESTS, connections: int = DEFAULT_CONNECTIONS,
+         port: Optional[int] = None, host: str = DEFAULT_HOST) -> Dict[str, float]:
+    """Run the load generator against the service on the given port, or against a service
+    started for it if port is None, print the report and return it.
+    """
+    process = None
+    if port is None:
+        process, port = start_service(host)
+    try:
+        report = asyncio.run(generate_load(host, port, requests, connections))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    for line in format_report(report):
+        print(line)
+    return report
+
+
+def _content_length(head: bytes) -> int:
+    """Return the Content-Length of the given response head."""
+    for line in head.split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            return int(value)
+    return 0
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    main(int(float(arguments[0])) if len(arguments) > 0 else DEFAULT_REQUESTS,
+         int(arguments[1]) if len(arguments) > 1 else DEFAULT_CONNECTIONS,
+         int(arguments[2]) if len(arguments) > 2 else None,
+         arguments[3] if len(arguments) > 3 else DEFAULT_HOST)
@@ -0,0 +1,149 @@
+"""
+This file handles projecting the global mean sea level into the future.
+
+A projection is described by a schedule of rate segments. Each segment has a rate of change in
+mm per year and an optional acceleration in mm per year per year, so the rate inside a segment
+is rate + acceleration * (time - start). The projected level at any time is the starting level
+plus the integral of that rate, which is a piecewise quadratic function of time. It is
+evaluated for every time step (and every schedule in a batch) at once, so no Python loop runs
+per year or per schedule.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+from typing import Optional, Sequence
+import numpy as np
+from sea_level_series import SeaLevelSeries
+
+
+class RateSegment:
+    """A period of the projection with a single rate of change.
+
+    Instance Attributes:
+        - start: the time the segment starts at, in years
+        - end: the time the segment ends at, in years
+        - rate: the rate of change at the start of the segment, in mm per year
+        - acceleration: the change of the rate, in mm per year per year
+
+    Representation Invariants:
+        - self.start < self.end
+    """
+    start: float
+    end: float
+    rate: float
+    acceleration: float
+
+    def __init__(self, start: float, end: float, rate: float, acceleration: float = 0.0) -> None:
+        """Initialize a new rate segment with the specified parameters
+
+        Preconditions:
+            - start < end
+        """
+        if not start < end:
+            raise ValueError(f'rate segment must end after it starts, got {start} to {end}')
+        self.start = start
+        self.end = end
+        self.rate = rate
+        self.acceleration = acceleration
+
+    def __repr__(self) -> str:
+        """Return a representation of this segment."""
+        return f'RateSegment({self.start!r}, {self.end!r}, {self.rate!r}, {self.acceleration!r})'
+
+
+# According to NASA, the rate of change is 3.3mm per year until 2080, and it is on average
+# 12mm per year from 2080-2100 (Church et al).
+DEFAULT_SCHEDULE = [RateSegment(2020, 2080, 3.3), RateSegment(2080, 2100, 12.0)]
+
+
+def project(start_level: float, segments: Sequence[RateSegment], step: float = 1.0,
+            end: Optional[float] = None) -> SeaLevelSeries:
+    """Return the projected global mean sea level from the start of the first segment until
+    end (the end of the last segment by default), one value every step years.
+
+    The first value of the returned series is start_level itself.
+
+    Preconditions:
+        - len(segments) > 0
+        - every segment starts where the previous one ends
+        - step > 0
+    """
+    boundaries = schedule_boundaries(segments)
+    times = time_grid(boundaries[0], boundaries[-1] if end is None else end, step)
+    levels = project_batch(np.array([start_level]),
+                           np.array([[segment.rate for segment in segments]]),
+                           boundaries, times,
+                           np.array([[segment.acceleration for segment in segments]]))
+    return SeaLevelSeries(times, levels[0])
+
+
+def project_batch(start_levels: np.ndarray, rates: np.ndarray, boundaries: np.ndarray,
+                  times: np.ndarray, accelerations: Optional[np.ndarray] = None) -> np.ndarray:
+    """Return an array of shape (len(start_levels), len(times)) with the projected levels of
+    many rate schedules that share the same segment boundaries.
+
+    rates[i][k] (and accelerations[i][k]) belong to the segment of schedule i from
+    boundaries[k] to boundaries[k + 1]. Times after the last boundary continue with the rate
+    of the last segment.
+
+    Preconditions:
+        - rates.shape == (len(start_levels), len(boundaries) - 1)
+        - accelerations is None or accelerations.shape == rates.shape
+        - boundaries is sorted in strictly ascending order
+        - all(time >= boundaries[0] for time in times)
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    boundaries = np.asarray(boundaries, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    if accelerations is None:
+        accelerations = np.zeros_like(rates)
+    else:
+        accelerations = np.asarray(accelerations, dtype=np.float64)
+
+    # The rise over every whole segment, and the total rise before every segment starts
+    lengths = np.diff(boundaries)
+    segment_rise = rates * lengths + accelerations * lengths ** 2 / 2
+    rise_before = np.zeros_like(rates)
+    np.cumsum(segment_rise[:, :-1], axis=1, out=rise_before[:, 1:])
+
+    # The segment each time falls in and how far into that segment it is
+    segment = np.clip(np.searchsorted(boundaries, times, side='right') - 1, 0, len(lengths) - 1)
+    elapsed = times - boundaries[segment]
+
+    rise = rise_before[:, segment] + rates[:, segment] * elapsed \
+        + accelerations[:, segment] * elapsed ** 2 / 2
+    return np.asarray(start_levels, dtype=np.float64)[:, np.newaxis] + rise
+
+
+def schedule_boundaries(segments: Sequence[RateSegment]) -> np.ndarray:
+    """Return the start of every segment followed by the end of the last one.
+
+    Raise a ValueError if the segments are empty or not contiguous.
+    """
+    if len(segments) == 0:
+        raise ValueError('a projection needs at least one rate segment')
+    for previous, segment in zip(segments, segments[1:]):
+        if previous.end != segment.start:
+            raise ValueError(f'rate segments must be contiguous, {previous!r} is followed by '
+                             f'{segment!r}')
+    return np.array([segment.start for segment in segments] + [segments[-1].end],
+                    dtype=np.float64)
+
+
+def time_grid(start: float, end: float, step: float = 1.0) -> np.ndarray:
+    """Return the times from start to end (inclusive), step years apart."""
+    if step <= 0:
+        raise ValueError(f'step must be positive, got {step}')
+    count = int(np.floor((end - start) / step + 1e-9)) + 1
+    return start + np.arange(count, dtype=np.float64) * step
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'typing', 'sea_level_series'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -1,7 +1,7 @@
 import pygame
 import sys
 import time
-from computations import read_csv, mean_sea_level_change, predict_2021_2080, predict_2081_2100, combine_data
+from computations import load_cached_data
 from typing import Tuple
 
 
@@ -47,12 +47,8 @@ font2 = pygame.font.SysFont('cambria', 50)
 font3 = pygame.font.SysFont('arial', 15)
 pygame.display.set_caption("Sea Level Rise Simulator")
 
-# Organizing the yearly data
-data = read_csv('Datasets/global_mean_sea_level.csv')
-data_1993_2020 = mean_sea_level_change(data)
-data_2021_2080 = predict_2021_2080(data_1993_2020['2020'])
-data_2081_2100 = predict_2081_2100(data_2021_2080['2080'])
-data = combine_data(data_1993_2020, data_2021_2080, data_2081_2100)
+# Organizing the yearly data, which is only computed again if the csv file changed
+data = load_cached_data('Datasets/global_mean_sea_level.csv')[0]
 scale_human_data = {}
 scale_venice_data = {}
 scale_newyork_data = {}
@@ -0,0 +1,386 @@
+"""
+This file runs the simulation scenes of the pygame simulation.
+
+Every scene is drawn the same way from its entry in scenes.SCENES: a background colour, the
+scene's images, the water, the labels and the year label, from the bottom to the top. A frame is
+built as a list of these layers and composited once for every changed region of the display.
+Layers below an opaque layer that covers the whole region are skipped, so the background colour
+is not filled behind a full screen image, and the regions that changed are found by comparing
+the layers of a frame with the layers of the previous one.
+
+The year moves in whole steps, but the water glides towards the level of the current year at
+one year per step interval, using the monthly positions of the water offset table.
+
+Pressing F3 in a scene starts or stops timing the phases of every frame, and shows their
+percentiles in the bottom left corner while timing. The recorded frames are written to
+frame_times.csv when the program exits.
+
+If the images of a scene are still being preloaded when it is entered, a progress bar is shown
+until they are ready.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+import sys
+from typing import Dict, List, Optional, Tuple, Union
+import pygame
+from scenes import BLACK, FIRST_YEAR, LAST_YEAR, LIGHT_BLUE, LIGHT_GREY, YEAR_LABEL_CENTER, \
+    Scene
+from text_cache import TextCache, year_text
+from dirty_rects import DirtyRects
+from year_stepper import YearStepper
+from assets import AssetManager
+from water_offsets import WaterOffsets
+from frame_timer import FrameTimer
+
+# The key that starts and stops timing the frames, and the file the timed frames are written to
+FRAME_TIMER_KEY = pygame.K_F3
+FRAME_TIMES_FILE = 'frame_times.csv'
+
+# The number of frames the frame time overlay is kept for before it is rendered again
+OVERLAY_FRAMES = 30
+
+# The region of the progress bar shown while the images of a scene are loading, its label,
+# and the frame rate while waiting
+PROGRESS_BAR_RECT = (150, 290, 300, 20)
+PROGRESS_LABEL_CENTER = (300, 260)
+LOADING_FRAME_RATE = 30
+
+
+class ImageLayer:
+    """An image drawn at a position of the display.
+
+    Instance Attributes:
+        - image: the image drawn
+        - rect: the region of the display the image covers
+        - opaque: whether every pixel of the image hides what is below it
+    """
+    image: pygame.Surface
+    rect: pygame.Rect
+    opaque: bool
+
+    def __init__(self, image: pygame.Surface, position: Tuple[int, int],
+                 opaque: Optional[bool] = None) -> None:
+        """Initialize a new layer drawing image with its top left corner at position.
+
+        If opaque is None, whether the image is opaque is found from its pixels.
+        """
+        self.image = image
+        self.rect = image.get_rect(topleft=position)
+        self.opaque = is_opaque(image) if opaque is None else opaque
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """Draw this layer on surface."""
+        surface.blit(self.image, self.rect)
+
+    def key(self) -> tuple:
+        """Return a value that is equal for two layers that draw the same pixels."""
+        return (id(self.image), tuple(self.rect))
+
+
+class FillLayer:
+    """A rectangle of the display filled with a single colour.
+
+    Instance Attributes:
+        - color: the RGB colour of the rectangle
+        - rect: the region of the display the rectangle covers
+        - opaque: always True
+    """
+    color: Tuple[int, int, int]
+    rect: pygame.Rect
+    opaque: bool
+
+    def __init__(self, color: Tuple[int, int, int], rect: pygame.Rect) -> None:
+        """Initialize a new layer filling rect with color."""
+        self.color = color
+        self.rect = pygame.Rect(rect)
+        self.opaque = True
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """Draw this layer on surface."""
+        surface.fill(self.color, self.rect)
+
+    def key(self) -> tuple:
+        """Return a value that is equal for two layers that draw the same pixels."""
+        return (self.color, tuple(self.rect))
+
+
+Layer = Union[ImageLayer, FillLayer]
+
+
+class SceneEngine:
+    """Runs any simulation scene until its back button is clicked.
+
+    The back button may be any object with a color attribute and over_button(position),
+    rect() and layers() methods, like the buttons of the simulation.
+
+    Instance Attributes:
+        - surface: the display surface
+        - clock: the clock limiting the frame rate
+        - dirty: the changed regions of the display
+        - text_cache: the cache of rendered text
+        - assets: the loader of the scene images
+        - font: the font of the year label and the labels
+        - caption_font: the font of the final captions and the frame time overlay
+        - water_offsets: the top of the water of every scene in every year
+        - frame_timer: the timer of the phases of every frame
+    """
+    surface: pygame.Surface
+    clock: pygame.time.Clock
+    dirty: DirtyRects
+    text_cache: TextCache
+    assets: AssetManager
+    font: pygame.font.Font
+    caption_font: pygame.font.Font
+    water_offsets: WaterOffsets
+    frame_timer: FrameTimer
+    # Private Instance Attributes:
+    #   - _overlay: the rendered frame time overlay, or None if it has not been rendered
+    #   - _overlay_frame: the value of frame_timer.frames when _overlay was rendered
+    _overlay: Optional[pygame.Surface]
+    _overlay_frame: int
+
+    def __init__(self, surface: pygame.Surface, clock: pygame.time.Clock, dirty: DirtyRects,
+                 text_cache: TextCache, assets: AssetManager, font: pygame.font.Font,
+                 caption_font: pygame.font.Font, water_offsets: WaterOffsets,
+                 frame_timer: Optional[FrameTimer] = None) -> None:
+        """Initialize a new scene engine drawing on surface."""
+        self.surface = surface
+        self.clock = clock
+        self.dirty = dirty
+        self.text_cache = text_cache
+        self.assets = assets
+        self.font = font
+        self.caption_font = caption_font
+        self.water_offsets = water_offsets
+        self.frame_timer = frame_timer if frame_timer is not None else FrameTimer()
+        self._overlay = None
+        self._overlay_frame = 0
+
+    def quit(self) -> None:
+        """Write the timed frames, if any, to FRAME_TIMES_FILE and exit the program."""
+        if self.frame_timer.frames > 0:
+            self.frame_timer.write_csv(FRAME_TIMES_FILE)
+        pygame.quit()
+        sys.exit()
+
+    def run(self, scene: Scene, back_button) -> None:
+        """Run the given scene from the first year until back_button is clicked.
+
+        Holding the left or right arrow key moves the year. Closing the window exits the
+        program.
+        """
+        self._wait_for_assets(scene)
+        images = self.assets.load_scene(scene.name)
+        opaque = {name: is_opaque(image) for name, image in images.items()}
+        origins = {name: self.assets.origin(name) for name in images}
+        offsets = self.water_offsets.scene(scene.name)
+        self.text_cache.prerender(self.font, [year_text(year) for year in
+                                              range(FIRST_YEAR, LAST_YEAR + 1)],
+                                  BLACK, LIGHT_GREY)
+        stepper = YearStepper(FIRST_YEAR, LAST_YEAR, scene.step_interval,
+                              scene.step_acceleration, scene.min_step_interval)
+        current_year = FIRST_YEAR
+        water_time = float(current_year)
+        shown_layers = []
+        back_button.color = LIGHT_BLUE if back_button.over_button(pygame.mouse.get_pos()) \
+            else LIGHT_GREY
+        self.dirty.mark_all()
+        elapsed = 0
+        running = True
+        timer = self.frame_timer
+
+        while running:
+            for event in pygame.event.get():  # User did something
+                pos = pygame.mouse.get_pos()
+
+                if event.type == pygame.QUIT:  # If user clicked close
+                    self.quit()
+
+                # Starting or stopping the frame timer
+                if event.type == pygame.KEYDOWN and event.key == FRAME_TIMER_KEY:
+                    timer.toggle()
+                    self._overlay = None
+
+                # Going back to the home screen if the user clicks the back button
+                if event.type == pygame.MOUSEBUTTONDOWN and back_button.over_button(pos):
+                    running = False
+
+                # Highlighting the back button to light blue if the mouse is over it
+                if event.type == pygame.MOUSEMOTION:
+                    if back_button.over_button(pos):
+                        back_button.color = LIGHT_BLUE
+                    else:
+                        back_button.color = LIGHT_GREY
+            timer.lap('events')
+
+            # Increasing and decreasing water levels
+            keys = pygame.key.get_pressed()
+            current_year = stepper.update(current_year, elapsed,
+                                          keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+            water_time = move_towards(water_time, current_year,
+                                      elapsed / stepper.current_interval)
+            timer.lap('update')
+
+            layers = scene_layers(scene, images, opaque, current_year,
+                                  int(offsets[self.water_offsets.index(water_time)]),
+                                  self.text_cache, self.font, self.caption_font, origins) + \
+                back_button.layers()
+            if timer.enabled:
+                layers.append(self._overlay_layer())
+            timer.lap('text')
+
+            # Drawing the parts of the screen that changed
+            for rect in changed_rects(shown_layers, layers):
+                self.dirty.mark(rect)
+            for region in self.dirty.regions(self.surface):
+                composite(self.surface, layers, region)
+            timer.lap('blits')
+            self.dirty.update()
+            shown_layers = layers
+            timer.lap('flip')
+
+            elapsed = self.clock.tick(scene.frame_rate)
+            timer.lap('tick')
+            timer.end_frame()
+
+    def _wait_for_assets(self, scene: Scene) -> None:
+        """Show a progress bar until the images of the given scene are preloaded, if they are
+        not ready yet.
+        """
+        shown_layers = []
+        self.dirty.mark_all()
+        while not self.assets.is_ready(scene.name):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+
+            bar = pygame.Rect(PROGRESS_BAR_RECT)
+            label = self.text_cache.render(self.font, f'Loading {scene.title}', BLACK)
+            layers = [FillLayer(scene.background, self.surface.get_rect()),
+                      ImageLayer(label, label.get_rect(center=PROGRESS_LABEL_CENTER).topleft,
+                                 False),
+                      FillLayer(LIGHT_GREY, bar),
+                      FillLayer(LIGHT_BLUE, (bar.x, bar.y,
+                                             int(bar.width * self.assets.progress(scene.name)),
+                                             bar.height))]
+
+            for rect in changed_rects(shown_layers, layers):
+                self.dirty.mark(rect)
+            for region in self.dirty.regions(self.surface):
+                composite(self.surface, layers, region)
+            self.dirty.update()
+            shown_layers = layers
+
+            self.clock.tick(LOADING_FRAME_RATE)
+
+    def _overlay_layer(self) -> ImageLayer:
+        """Return the layer of the frame time overlay, rendering the overlay again if it is
+        older than OVERLAY_FRAMES frames.
+        """
+        frames = self.frame_timer.frames
+        if self._overlay is None or frames - self._overlay_frame >= OVERLAY_FRAMES:
+            lines = self.frame_timer.summary() or ['Timing frames...']
+            rendered = [self.caption_font.render(line, True, BLACK, LIGHT_GREY)
+                        for line in lines]
+            self._overlay = pygame.Surface((max(line.get_width() for line in rendered),
+                                            sum(line.get_height() for line in rendered)))
+            self._overlay.fill(LIGHT_GREY)
+            y = 0
+            for line in rendered:
+                self._overlay.blit(line, (0, y))
+                y += line.get_height()
+            self._overlay_frame = frames
+
+        height = self.surface.get_height()
+        return ImageLayer(self._overlay, (0, height - self._overlay.get_height()), True)
+
+
+def scene_layers(scene: Scene, images: Dict[str, pygame.Surface], opaque: Dict[str, bool],
+                 year: int, water_offset: int, text_cache: TextCache, font: pygame.font.Font,
+                 caption_font: pygame.font.Font,
+                 origins: Optional[Dict[str, Tuple[int, int]]] = None) -> List[Layer]:
+    """Return the layers of the frame of scene in the given year, with the top of the water at
+    water_offset, from the bottom to the top.
+
+    images maps the names of the scene's images to the loaded images, and opaque maps them to
+    whether they are opaque. origins maps the names of cropped images to the position of the
+    loaded part in the whole image, which is (0, 0) for the images it leaves out.
+    """
+    if origins is None:
+        origins = {}
+    surface_rect = pygame.Rect((0, 0), pygame.display.get_surface().get_size())
+    layers = [FillLayer(scene.background, surface_rect)]
+    for name, (x, y) in scene.layers + [(scene.water, (0, water_offset))]:
+        origin_x, origin_y = origins.get(name, (0, 0))
+        layers.append(ImageLayer(images[name], (x + origin_x, y + origin_y), opaque[name]))
+
+    texts = [(font, text, center) for text, center in scene.labels]
+    if year == LAST_YEAR:
+        texts.extend((caption_font, text, center) for text, center in scene.final_captions)
+    for text_font, text, center in texts:
+        label = text_cache.render(text_font, text, BLACK)
+        layers.append(ImageLayer(label, label.get_rect(center=center).topleft, False))
+
+    year_label = text_cache.render(font, year_text(year), BLACK, LIGHT_GREY)
+    layers.append(ImageLayer(year_label, year_label.get_rect(center=YEAR_LABEL_CENTER).topleft,
+                             True))
+    return layers
+
+
+def composite(surface: pygame.Surface, layers: List[Layer], region: pygame.Rect) -> None:
+    """Draw the parts of layers (from the bottom to the top) that are inside region on surface.
+
+    Drawing starts at the highest opaque layer covering the whole region, since every layer
+    below it would be hidden, and layers outside the region are not drawn at all.
+    """
+    start = 0
+    for i in range(len(layers) - 1, -1, -1):
+        if layers[i].opaque and layers[i].rect.contains(region):
+            start = i
+            break
+
+    for layer in layers[start:]:
+        if layer.rect.colliderect(region):
+            layer.draw(surface)
+
+
+def changed_rects(old_layers: List[Layer], new_layers: List[Layer]) -> List[pygame.Rect]:
+    """Return the regions of the display drawn differently by new_layers than by old_layers,
+    which are the regions of the layers that are in only one of the two lists.
+    """
+    old_keys = {layer.key() for layer in old_layers}
+    new_keys = {layer.key() for layer in new_layers}
+    return [layer.rect for layer in old_layers if layer.key() not in new_keys] + \
+        [layer.rect for layer in new_layers if layer.key() not in old_keys]
+
+
+def move_towards(value: float, target: float, max_change: float) -> float:
+    """Return value moved towards target by at most max_change.
+
+    Preconditions:
+        - max_change >= 0
+    """
+    if value < target:
+        return min(value + max_change, target)
+    return max(value - max_change, target)
+
+
+def is_opaque(image: pygame.Surface) -> bool:
+    """Return whether drawing image hides every pixel below it."""
+    if image.get_colorkey() is not None:
+        return False
+    if not image.get_flags() & pygame.SRCALPHA:
+        return image.get_alpha() in (None, 255)
+    mask = pygame.mask.from_surface(image, 254)
+    return mask.count() == image.get_width() * image.get_height()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['sys', 'typing', 'pygame', 'scenes', 'text_cache', 'dirty_rects',
+                          'year_stepper', 'assets', 'water_offsets', 'frame_timer'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'R0913', 'R0902', 'E1101']
+    })
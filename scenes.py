@@ -0,0 +1,152 @@
+"""
+This file describes the images and scenes of the pygame simulation.
+
+It only contains data, so it can be used by the interactive simulation and by the headless
+frame renderer without opening a display. Every scene is drawn by the same scene engine from
+its entry in SCENES, so adding a city only takes a new entry (and its images in IMAGES).
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+SCREENWIDTH = 600
+SCREENHEIGHT = 600
+
+FIRST_YEAR = 1993
+LAST_YEAR = 2100
+
+IMAGE_DIRECTORY = 'Images'
+
+# Setting variables for various RGB colours
+LIGHT_GREY = (201, 201, 201)
+BLACK = (0, 0, 0)
+LIGHT_BLUE = (151, 203, 255)
+WHITE = (255, 255, 255)
+
+# The center of the year label drawn in the top right corner of every scene
+YEAR_LABEL_CENTER = (540, 15)
+
+# The number of positions of the water per year when it moves between years (one per month)
+WATER_STEPS_PER_YEAR = 12
+
+# Mapping every image name to its file and the size it is scaled to (None keeps the file's size)
+IMAGES: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {
+    'male': ('male.png', None),
+    'female': ('female.png', (600, 550)),
+    'venice': ('venice2.jpeg', None),
+    'new_york': ('newyork.jpg', (600, 600)),
+    'amsterdam': ('Amsterdam.png', (600, 600)),
+    'real_ocean': ('realocean.jpg', (600, 178)),
+    'sky': ('sky.jpg', (600, 600)),
+    'water': ('ocean.png', None),
+    'home_screen': ('homescreenimage.jpg', (600, 600))
+}
+
+NEW_YORK_CAPTIONS = [
+    ('This may not look like a significant change compared to the size', (300, 50)),
+    ('of the Statue of Liberty Island, but throughout time, as the water rises,', (300, 70)),
+    ('the water will begin to seep into the concrete foundation and '
+     'break it down, causing structural damage', (300, 90))
+]
+
+
+class Scene:
+    """A simulation scene showing the water rising in front of a background.
+
+    Instance Attributes:
+        - name: the name of the scene
+        - title: the text of the home screen button that opens the scene
+        - layers: the images drawn below the water, as (image name, position) pairs
+        - water: the name of the water image
+        - water_height: the y coordinate of the water surface when the sea level is 0
+        - divisor: the number of mm of sea level rise per pixel
+        - labels: text drawn above the water, as (text, center) pairs
+        - final_captions: text drawn above the water in the last year, as (text, center) pairs
+        - frame_rate: the number of frames per second of the scene
+        - step_interval: the time between the first and the second step of the year while an
+          arrow key is held, in ms
+        - step_acceleration: the factor the time between steps is multiplied by after every
+          repeated step, so holding a key moves the year faster and faster
+        - min_step_interval: the smallest time between steps of the year, in ms
+        - button_center: the center of the home screen button that opens the scene
+        - background: the colour drawn behind the layers
+
+    Representation Invariants:
+        - self.divisor > 0
+        - self.frame_rate > 0
+        - 0 < self.min_step_interval <= self.step_interval
+        - 0 < self.step_acceleration <= 1
+    """
+    name: str
+    title: str
+    layers: List[Tuple[str, Tuple[int, int]]]
+    water: str
+    water_height: int
+    divisor: float
+    labels: List[Tuple[str, Tuple[int, int]]]
+    final_captions: List[Tuple[str, Tuple[int, int]]]
+    frame_rate: int
+    step_interval: float
+    step_acceleration: float
+    min_step_interval: float
+    button_center: Tuple[int, int]
+    background: Tuple[int, int, int]
+
+    def __init__(self, name: str, title: str, layers: List[Tuple[str, Tuple[int, int]]],
+                 water: str, water_height: int, divisor: float,
+                 labels: Optional[List[Tuple[str, Tuple[int, int]]]] = None,
+                 final_captions: Optional[List[Tuple[str, Tuple[int, int]]]] = None,
+                 frame_rate: int = 60, step_interval: float = 100.0,
+                 step_acceleration: float = 1.0, min_step_interval: float = 20.0,
+                 button_center: Tuple[int, int] = (0, 0),
+                 background: Tuple[int, int, int] = WHITE) -> None:
+        """Initialize a new scene with the specified parameters"""
+        self.name = name
+        self.title = title
+        self.layers = layers
+        self.water = water
+        self.water_height = water_height
+        self.divisor = divisor
+        self.labels = labels if labels is not None else []
+        self.final_captions = final_captions if final_captions is not None else []
+        self.frame_rate = frame_rate
+        self.step_interval = step_interval
+        self.step_acceleration = step_acceleration
+        self.min_step_interval = min(min_step_interval, step_interval)
+        self.button_center = button_center
+        self.background = background
+
+    def images(self) -> List[str]:
+        """Return the names of every image this scene draws."""
+        return [image for image, _ in self.layers] + [self.water]
+
+    def water_offset(self, sea_level: float) -> int:
+        """Return the y coordinate of the top of the water for the given sea level."""
+        return self.water_height - int(sea_level / self.divisor)
+
+
+SCENES = {
+    'human': Scene('human', 'Human Simulation',
+                   [('sky', (0, 0)), ('male', (100, 28)), ('female', (100, 70))],
+                   'water', 600, 3,
+                   labels=[('5\'9', (196, 14)), ('5\'3', (400, 76))], frame_rate=15,
+                   button_center=(SCREENWIDTH // 4, SCREENHEIGHT // 2)),
+    'venice': Scene('venice', 'Venice Simulation', [('venice', (-200, 0))],
+                    'real_ocean', 535, 13, button_center=(SCREENWIDTH * 3 // 4, 400)),
+    'new_york': Scene('new_york', 'New York Simulation', [('new_york', (0, 0))],
+                      'real_ocean', 532, 60, final_captions=NEW_YORK_CAPTIONS,
+                      step_interval=80.0,
+                      button_center=(SCREENWIDTH * 3 // 4, SCREENHEIGHT // 2)),
+    'amsterdam': Scene('amsterdam', 'Amsterdam Simulation', [('amsterdam', (0, 0))],
+                       'real_ocean', 525, 20, button_center=(SCREENWIDTH // 4, 400))
+}
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['typing'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'R0913', 'R0902']
+    })
@@ -0,0 +1,200 @@
+"""
+This file contains the SeaLevelSeries class, a columnar store for global mean sea level data.
+
+A SeaLevelSeries keeps its timestamps and values in NumPy arrays instead of a dictionary keyed
+by year strings, so yearly and monthly series take a fraction of the memory and can be used in
+vectorized calculations. The old dictionary view is still available through to_dict.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+from typing import Dict, Optional, Union
+import numpy as np
+
+# Values closer than this to a tie, in units of the last decimal they are rounded to, can round
+# either way depending on the order their last bits were computed in
+TIE_TOLERANCE = 1e-6
+
+
+class SeaLevelSeries:
+    """A global mean sea level time series stored as NumPy arrays.
+
+    Instance Attributes:
+        - times: float64 array of timestamps in (decimal) years, sorted in ascending order
+        - values: float64 array of global mean sea levels, values[i] is the level at times[i]
+        - step: the constant spacing between timestamps, or None if the spacing is irregular
+
+    Representation Invariants:
+        - self.times.ndim == 1
+        - self.times.shape == self.values.shape
+        - all(self.times[i] < self.times[i + 1] for i in range(len(self.times) - 1))
+        - self.step is None or self.step > 0
+    """
+    times: np.ndarray
+    values: np.ndarray
+    step: Optional[float]
+
+    def __init__(self, times: np.ndarray, values: np.ndarray) -> None:
+        """Initialize a new series from the given timestamps and values.
+
+        Preconditions:
+            - len(times) == len(values)
+            - times is sorted in strictly ascending order
+        """
+        self.times = np.ascontiguousarray(times, dtype=np.float64)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        if self.times.shape != self.values.shape or self.times.ndim != 1:
+            raise ValueError('times and values must be one dimensional arrays of the same length')
+        self.step = _regular_step(self.times)
+
+    @classmethod
+    def annual(cls, start_year: int, values: np.ndarray) -> 'SeaLevelSeries':
+        """Return a yearly series whose first value belongs to start_year."""
+        values = np.asarray(values, dtype=np.float64)
+        return cls(start_year + np.arange(len(values), dtype=np.float64), values)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> 'SeaLevelSeries':
+        """Return a series built from a dictionary mapping years (as strings) to sea levels,
+        such as the ones returned by read_csv and mean_sea_level_change.
+        """
+        times = np.fromiter((float(key) for key in data), dtype=np.float64, count=len(data))
+        values = np.fromiter(data.values(), dtype=np.float64, count=len(data))
+        order = np.argsort(times, kind='stable')
+        return cls(times[order], values[order])
+
+    def to_dict(self, decimals: Optional[int] = None) -> Dict[str, float]:
+        """Return the old dictionary view of this series, mapping years (as strings) to sea
+        levels. Whole years are written without a decimal point, e.g. '1993'.
+
+        If decimals is given, every value is rounded with round(value, decimals).
+        """
+        if decimals is None:
+            values = self.values.tolist()
+        else:
+            values = [round(value, decimals) for value in self.values.tolist()]
+        return dict(zip(self.labels(), values))
+
+    def labels(self) -> list:
+        """Return the timestamps of this series formatted as dictionary keys."""
+        if np.all(self.times == np.floor(self.times)):
+            return [str(year) for year in self.times.astype(np.int64).tolist()]
+        return [repr(time) for time in self.times.tolist()]
+
+    @property
+    def years(self) -> np.ndarray:
+        """The whole year of every timestamp, as an int64 array."""
+        return np.floor(self.times).astype(np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the timestamp and value arrays."""
+        return self.times.nbytes + self.values.nbytes
+
+    def index_of(self, time: float) -> int:
+        """Return the position of the given timestamp in this series.
+
+        The lookup is a single subtraction for regularly spaced series, and a binary search
+        otherwise. Raise a KeyError if the timestamp is not in the series.
+        """
+        n = len(self.times)
+        if self.step is not None and n > 0:
+            index = int(round((time - self.times[0]) / self.step))
+            if 0 <= index < n and abs(self.times[index] - time) <= 1e-9 * self.step:
+                return index
+        else:
+            index = int(np.searchsorted(self.times, time))
+            if index < n and self.times[index] == time:
+                return index
+        raise KeyError(time)
+
+    def slice(self, start: Optional[float] = None, stop: Optional[float] = None) \
+            -> 'SeaLevelSeries':
+        """Return the part of this series with start <= time <= stop. The returned series
+        shares memory with this one.
+        """
+        low = 0 if start is None else int(np.searchsorted(self.times, start, side='left'))
+        high = len(self.times) if stop is None \
+            else int(np.searchsorted(self.times, stop, side='right'))
+        return SeaLevelSeries(self.times[low:high], self.values[low:high])
+
+    def combine(self, other: 'SeaLevelSeries') -> 'SeaLevelSeries':
+        """Return a series containing the values of both series. Where both series have a
+        value for the same timestamp, the value of other is used, like dict.update.
+        """
+        keep = ~np.isin(self.times, other.times)
+        times = np.concatenate((self.times[keep], other.times))
+        values = np.concatenate((self.values[keep], other.values))
+        order = np.argsort(times, kind='stable')
+        return SeaLevelSeries(times[order], values[order])
+
+    def __len__(self) -> int:
+        """Return the number of samples in this series."""
+        return len(self.times)
+
+    def __getitem__(self, key: Union[float, str, slice]) -> Union[float, 'SeaLevelSeries']:
+        """Return the sea level at the given year, or the sub-series between the start and
+        stop years of a slice (both inclusive).
+        """
+        if isinstance(key, slice):
+            return self.slice(key.start, key.stop)
+        return float(self.values[self.index_of(float(key))])
+
+    def __contains__(self, key: Union[float, str]) -> bool:
+        """Return whether this series has a value for the given year."""
+        try:
+            self.index_of(float(key))
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        """Return a short description of this series."""
+        if len(self.times) == 0:
+            return 'SeaLevelSeries(empty)'
+        return f'SeaLevelSeries({len(self.times)} samples, ' \
+               f'{self.times[0]:g}-{self.times[-1]:g})'
+
+
+def near_ties(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Return a boolean array of whether every value is within TIE_TOLERANCE of a tie when it
+    is rounded to the given number of decimals.
+    """
+    scaled = np.asarray(values, dtype=np.float64) * 10 ** decimals
+    return np.abs(scaled - np.floor(scaled) - 0.5) < TIE_TOLERANCE
+
+
+def round_values(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Return every value rounded to the given number of decimals exactly like round does.
+
+    np.round only differs from round near a tie, so those values are rounded with round.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    ties = near_ties(values, decimals)
+    rounded[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    return rounded
+
+
+def _regular_step(times: np.ndarray) -> Optional[float]:
+    """Return the constant spacing between the given sorted timestamps, or None if the
+    spacing is not constant.
+    """
+    if len(times) < 2:
+        return 1.0
+    steps = np.diff(times)
+    step = float(steps[0])
+    if step > 0 and np.allclose(steps, step, rtol=0, atol=1e-9 * max(1.0, step)):
+        return step
+    return None
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['numpy', 'typing'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
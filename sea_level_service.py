@@ -0,0 +1,207 @@
+"""
+This file is responsible for the JSON query service of the program.
+
+The service answers HTTP GET requests on a local port with JSON, so other programs can use the
+numbers of the simulation directly. Every answer is for one year (?year=2050) or a range of
+years (?start=2030&end=2050, where both ends are included and either can be left out):
+    - /gmsl: the global mean sea level of every year
+    - /factors: the contribution of every component from factor_contribution
+    - /scaled: the sea level of every scene (?scene=venice,new_york for some of them), scaled
+      to pixels by the divisor of the scene
+
+The data is computed once when the service starts and kept in NumPy arrays with one column per
+year, so a request only takes a slice of them. The service runs on a single asyncio event loop
+built on asyncio.start_server, and keeps connections open between requests. load_generator.py
+measures how many requests it answers per second.
+
+All the corresponding global mean sea level values are in mm.
+
+Usage: python sea_level_service.py [port] [host]
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from computations import load_cached_data
+from factors import COMPONENTS
+from scenes import SCENES, Scene
+
+DATA_FILE = 'Datasets/global_mean_sea_level.csv'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+ROUTES = ('/gmsl', '/factors', '/scaled')
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class QueryError(Exception):
+    """Raised when a request cannot be answered.
+
+    Instance Attributes:
+        - status: the HTTP status code of the answer
+    """
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        """Initialize a new query error with the given status code and message."""
+        super().__init__(message)
+        self.status = status
+
+
+class SeaLevelService:
+    """The precomputed answers of the query service.
+
+    Instance Attributes:
+        - years: int64 array of every year, in ascending order with no gaps
+        - levels: the global mean sea level of every year
+        - contributions: array of shape (len(years), len(COMPONENTS)) with the contribution of
+          every component in every year
+        - scene_names: the name of every scene
+        - scaled: array of shape (len(scene_names), len(years)) with the sea level of every
+          year scaled by the divisor of every scene
+
+    Representation Invariants:
+        - all(self.years[i + 1] == self.years[i] + 1 for i in range(len(self.years) - 1))
+        - self.levels.shape == self.years.shape
+    """
+    years: np.ndarray
+    levels: np.ndarray
+    contributions: np.ndarray
+    scene_names: List[str]
+    scaled: np.ndarray
+
+    def __init__(self, data: Dict[str, float], factor_data: Dict[str, List[float]],
+                 scenes: Optional[Dict[str, Scene]] = None) -> None:
+        """Initialize the answers from the dictionaries returned by combine_data and
+        factor_contribution.
+
+        Preconditions:
+            - data is not empty and its years are consecutive whole years
+            - list(factor_data) == list(data)
+        """
+        if scenes is None:
+            scenes = SCENES
+        self.years = np.array([int(year) for year in data], dtype=np.int64)
+        order = np.argsort(self.years)
+        self.years = self.years[order]
+        if np.any(np.diff(self.years) != 1):
+            raise ValueError('the service needs one value for every year without gaps')
+        self.levels = np.fromiter(data.values(), dtype=np.float64, count=len(data))[order]
+        self.contributions = np.array(list(factor_data.values()), dtype=np.float64)[order]
+        self.scene_names = list(scenes)
+        divisors = np.array([scene.divisor for scene in scenes.values()], dtype=np.float64)
+        self.scaled = np.round(self.levels / divisors[:, np.newaxis], 2)
+
+    @classmethod
+    def from_file(cls, filename: str = DATA_FILE) -> 'SeaLevelService':
+        """Return the service answering with the data of the given csv file."""
+        data, factor_data = load_cached_data(filename)
+        return cls(data, factor_data)
+
+    def query(self, target: str) -> dict:
+        """Return the answer to the given request target, such as '/gmsl?year=2050'.
+
+        Raise a QueryError if the path is unknown or the parameters are not valid.
+        """
+        parts = urlsplit(target)
+        parameters = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        if parts.path not in ROUTES:
+            raise QueryError(404, f'unknown path {parts.path!r}, expected one of {ROUTES}')
+
+        low, high = self._year_range(parameters)
+        answer = {'years': self.years[low:high].tolist()}
+        if parts.path == '/gmsl':
+            answer['gmsl'] = self.levels[low:high].tolist()
+        elif parts.path == '/factors':
+            answer['components'] = list(COMPONENTS)
+            answer['contributions'] = self.contributions[low:high].tolist()
+        else:
+            names = self.scene_names
+            if 'scene' in parameters:
+                names = parameters['scene'].split(',')
+                unknown = [name for name in names if name not in self.scene_names]
+                if unknown:
+                    raise QueryError(400, f'unknown scenes {unknown}, expected some of '
+                                          f'{self.scene_names}')
+            answer['scaled'] = {name: self.scaled[self.scene_names.index(name), low:high].tolist()
+                                for name in names}
+        return answer
+
+    def _year_range(self, parameters: Dict[str, str]) -> Tuple[int, int]:
+        """Return the first and one past the last column of the years asked for."""
+        first, last = int(self.years[0]), int(self.years[-1])
+        try:
+            if 'year' in parameters:
+                start = end = int(parameters['year'])
+            else:
+                start = int(parameters.get('start', first))
+                end = int(parameters.get('end', last))
+        except ValueError:
+            raise QueryError(400, 'years must be whole numbers') from None
+        if not first <= start <= end <= last:
+            raise QueryError(400, f'years must be between {first} and {last}, with start <= end')
+        return start - first, end - first + 1
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                request = lines[0].split(' ')
+                headers = {name.strip().lower(): value.strip()
+                           for name, _, value in (line.partition(':') for line in lines[1:])}
+                keep_alive = headers.get('connection', '').lower() != 'close' \
+                    and request[-1] == 'HTTP/1.1'
+
+                writer.write(self.respond(request))
+                if not keep_alive:
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, request: List[str]) -> bytes:
+        """Return the HTTP response to the given request line split into its words."""
+        status = 200
+        if len(request) != 3:
+            status, answer = 400, {'error': 'malformed request line'}
+        elif request[0] != 'GET':
+            status, answer = 405, {'error': 'only GET requests are supported'}
+        else:
+            try:
+                answer = self.query(request[1])
+            except QueryError as error:
+                status, answer = error.status, {'error': str(error)}
+
+        body = json.dumps(answer, separators=(',', ':')).encode()
+        return f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n' \
+               f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Answer requests on the given host and port until the program is stopped."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f'serving sea levels on http://{address[0]}:{address[1]}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    service = SeaLevelService.from_file()
+    try:
+        asyncio.run(service.serve(arguments[1] if len(arguments) > 1 else DEFAULT_HOST,
+                                  int(arguments[0]) if len(arguments) > 0 else DEFAULT_PORT))
+    except KeyboardInterrupt:
+        pass
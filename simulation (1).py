@@ -5,11 +5,17 @@ This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and
 """
 
 import pygame
-import sys
-import time
-from computations import read_csv, mean_sea_level_change, predict_2021_2080, predict_2081_2100,\
-    combine_data
-from typing import Tuple
+from computations import load_cached_data
+from gmsl_cache import load_series
+from assets import AssetManager
+from text_cache import TextCache
+from dirty_rects import DirtyRects
+from scenes import BLACK, LIGHT_BLUE, LIGHT_GREY, SCENES, SCREENHEIGHT, SCREENWIDTH, \
+    WATER_STEPS_PER_YEAR
+from scene_engine import FRAME_TIMER_KEY, FillLayer, ImageLayer, Layer, SceneEngine
+from sea_level_series import SeaLevelSeries
+from water_offsets import WaterOffsets
+from typing import List, Tuple
 import python_ta
 
 
@@ -18,39 +24,12 @@ def run_simulation() -> None:
     """
     pygame.init()  # Initializing pygame
 
-    # Setting variables for various RGB colours
-    LIGHT_GREY = (201, 201, 201)
-    BLACK = (0, 0, 0)
-    LIGHT_BLUE = (151, 203, 255)
-    WHITE = (255, 255, 255)
-    # WATER = (51, 187, 255)
-    # RED = (255, 0, 0)
-
     # Setting up pygame window
-    SCREENWIDTH = 600
-    SCREENHEIGHT = 600
     display_surface = pygame.display.set_mode((SCREENWIDTH, SCREENHEIGHT))
-    size = (SCREENWIDTH, SCREENHEIGHT)
-    screen = pygame.display.set_mode(size)
-
-    # Loading in all images
-    image = pygame.image.load('Images/male.png')
-    female = pygame.image.load('Images/female.png')
-    venice = pygame.image.load('Images/venice2.jpeg')
-    new_york = pygame.image.load('Images/newyork.jpg')
-    amsterdam = pygame.image.load('Images/Amsterdam.png')
-    ocean = pygame.image.load('Images/realocean.jpg')
-    sky = pygame.image.load('Images/sky.jpg')
-    water = pygame.image.load('Images/ocean.png')
-    home_screen = pygame.image.load('Images/homescreenimage.jpg')
-
-    # Transforming various image sizes
-    real_ocean = pygame.transform.scale(ocean, (600, 178))
-    female1 = pygame.transform.scale(female, (600, 550))
-    sky_1 = pygame.transform.scale(sky, (600, 600))
-    home_screen1 = pygame.transform.scale(home_screen, (600, 600))
-    new_york1 = pygame.transform.scale(new_york, (600, 600))
-    amsterdam1 = pygame.transform.scale(amsterdam, (600, 600))
+
+    # Images are loaded, scaled and converted to the display format in the background while the
+    # home screen is shown, or when their scene is entered
+    assets = AssetManager()
 
     # Setting up font and pygame display caption
     font = pygame.font.SysFont('arial', 30)
@@ -58,25 +37,18 @@ def run_simulation() -> None:
     font3 = pygame.font.SysFont('arial', 15)
     pygame.display.set_caption("Sea Level Rise Simulator")
 
-    # Organizing the yearly data
-    data = read_csv('Datasets/global_mean_sea_level.csv')
-    data_1993_2020 = mean_sea_level_change(data)
-    data_2021_2080 = predict_2021_2080(data_1993_2020['2020'])
-    data_2081_2100 = predict_2081_2100(data_2021_2080['2080'])
-    data = combine_data(data_1993_2020, data_2021_2080, data_2081_2100)
-    scale_human_data = {}
-    scale_venice_data = {}
-    scale_newyork_data = {}
-    scale_amsterdam_data = {}
-
-    # Scaling data to fit visual models
-    for i in data:
-        scale_human_data[i] = data[i] / 3
-        scale_venice_data[i] = data[i] / 13
-        scale_newyork_data[i] = data[i] / 60
-        scale_amsterdam_data[i] = data[i] / 20
-
-    current_year = 1993
+    # Rendered text is cached, and every year label is rendered when a scene is entered
+    text_cache = TextCache()
+
+    # Organizing the yearly data, which is only computed again if the csv file changed
+    data = load_cached_data('Datasets/global_mean_sea_level.csv')[0]
+
+    # Computing the top of the water of every scene in every month at once, from the monthly
+    # averages of the measured rows until 2020 and from the predictions after that
+    measured = load_series('Datasets/global_mean_sea_level.csv')
+    water_offsets = WaterOffsets.from_series(SeaLevelSeries.from_dict(data),
+                                             steps_per_year=WATER_STEPS_PER_YEAR,
+                                             measured=measured)
 
     class Button:
         """A class representing a clickable button in the pygame display.
@@ -125,12 +97,18 @@ def run_simulation() -> None:
 
         def draw(self, window) -> None:
             """method to draw the button on the screen"""
-            pygame.draw.rect(window, self.color, (self.x, self.y, self.width, self.height), 0)
+            for layer in self.layers():
+                layer.draw(window)
+
+        def layers(self) -> List[Layer]:
+            """Return the layers the button is drawn with, from the bottom to the top"""
+            layers = [FillLayer(self.color, self.rect())]
             if self.name != '':
-                text1 = font.render(self.name, True, (0, 0, 0))
-                screen.blit(text1, (
-                    self.x + (self.width / 2 - text1.get_width() / 2),
-                    self.y + (self.height / 2 - text1.get_height() / 2)))
+                text1 = text_cache.render(font, self.name, (0, 0, 0))
+                layers.append(ImageLayer(text1, (
+                    int(self.x + (self.width / 2 - text1.get_width() / 2)),
+                    int(self.y + (self.height / 2 - text1.get_height() / 2))), False))
+            return layers
 
         def over_button(self, position) -> bool:
             """Determine whether position of mouse is over the button or not"""
@@ -140,414 +118,117 @@ def run_simulation() -> None:
 
             return False
 
-    # Setting main and homeScreen to True to begin pygame loops
-    Main = True
-    homeScreen = True
-    Demo = False
-    simulationVenice = False
-    simulationTwo = False
-    simulationThree = False
-    # simulationFour = False
+        def rect(self) -> pygame.Rect:
+            """Return the region of the screen the button covers"""
+            return pygame.Rect(self.x, self.y, self.width, self.height)
 
     # The clock will be used to control how fast the screen updates
     clock = pygame.time.Clock()
 
-    # Creating four instances of button class which will appear on the home screen
-    button1 = Button(LIGHT_GREY, SCREENWIDTH / 4, SCREENHEIGHT / 2, 275, 75, 'Human Simulation')
-    button2 = Button(LIGHT_GREY, SCREENWIDTH * (3 / 4), 400, 275, 75, 'Venice Simulation')
-    button3 = Button(LIGHT_GREY, SCREENWIDTH * (3 / 4), SCREENHEIGHT / 2, 275, 75,
-                     'New York Simulation')
-    button4 = Button(LIGHT_GREY, SCREENWIDTH / 4, 400, 275, 75, 'Amsterdam Simulation')
+    # Creating a home screen button for every scene, and the back button shared by the scenes
+    scene_buttons = {name: Button(LIGHT_GREY, scene.button_center[0], scene.button_center[1],
+                                  275, 75, scene.title)
+                     for name, scene in SCENES.items()}
+    back_button = Button(LIGHT_GREY, 50, 25, 100, 50, 'Back')
+
+    # Only the parts of the screen that changed are drawn and sent to the display
+    dirty = DirtyRects(display_surface.get_rect())
 
-    # Creating four instances of button class which are back buttons
-    demo_back_button = Button(LIGHT_GREY, 50, 25, 100, 50, 'Back')
-    venice_back_button = Button(LIGHT_GREY, 50, 25, 100, 50, 'Back')
-    newyork_back_button = Button(LIGHT_GREY, 50, 25, 100, 50, 'Back')
-    amsterdam_back_button = Button(LIGHT_GREY, 50, 25, 100, 50, 'Back')
+    # Every scene is run by the same engine from its entry in SCENES
+    engine = SceneEngine(display_surface, clock, dirty, text_cache, assets, font, font3,
+                         water_offsets)
+
+    # The home screen frames are timed with the same phases as the frames of the scenes
+    timer = engine.frame_timer
+
+    # The home screen is shown as soon as its own image is loaded while the images of the
+    # scenes are decoded in the background, once, so images dropped to stay in the budget are
+    # only loaded again when their scene is entered
+    assets.load_scene('home')
+    assets.preload(SCENES)
 
     # Main pygame loop
-    while Main is True:
+    while True:
         for event in pygame.event.get():
-            # pos = pygame.mouse.get_pos()
             if event.type == pygame.QUIT:
-                # Main = False
-                pygame.quit()
-                sys.exit()
+                engine.quit()
 
         # Home screen loop
-        while homeScreen is True:
-            display_surface.blit(home_screen1, (0, 0))
-            button1.draw(display_surface)
-            button2.draw(display_surface)
-            button3.draw(display_surface)
-            button4.draw(display_surface)
-            title_text = font2.render('Sea Level Rise Simulator', True, BLACK)
-            title_text_rect = title_text.get_rect(center=(SCREENWIDTH / 2, 125))
-            screen.blit(title_text, title_text_rect)
-
-            # Main event loop
-            for event in pygame.event.get():  # User did something
-                pos = pygame.mouse.get_pos()
-
-                if event.type == pygame.QUIT:  # If user clicked close
-                    # homeScreen = False  # Flag that we are done so we exit this loop
-                    pygame.quit()
-                    sys.exit()
-
-                # Switching screens based on which button the user clicks
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if button1.over_button(pos) is True:
-                        homeScreen = False
-                        Demo = True
-                    if button2.over_button(pos) is True:
-                        homeScreen = False
-                        simulationVenice = True
-                    if button3.over_button(pos) is True:
-                        homeScreen = False
-                        simulationTwo = True
-                    if button4.over_button(pos) is True:
-                        homeScreen = False
-                        simulationThree = True
-
-                # Highlighting the buttons to light blue if motion is detected over the buttons
-                if event.type == pygame.MOUSEMOTION:
-                    if button1.over_button(pos) is True:
-                        button1.color = LIGHT_BLUE
-                    elif button2.over_button(pos) is True:
-                        button2.color = LIGHT_BLUE
-                    elif button3.over_button(pos) is True:
-                        button3.color = LIGHT_BLUE
-                    elif button4.over_button(pos) is True:
-                        button4.color = LIGHT_BLUE
-                    else:
-                        button1.color = LIGHT_GREY
-                        button2.color = LIGHT_GREY
-                        button3.color = LIGHT_GREY
-                        button4.color = LIGHT_GREY
-
-            # Updating the screen with everything drawn
-            pygame.display.flip()
-
-            # Limit to 60 frames per second
-            clock.tick(60)
-
-        # Human Simulation loop
-        while Demo is True:
-            display_surface.blit(sky_1, (0, 0))
-            demo_back_button.draw(display_surface)
-
-            # Main event loop
-            for event in pygame.event.get():  # User did something
-                pos = pygame.mouse.get_pos()
-
-                if event.type == pygame.QUIT:  # If user clicked close
-                    # Demo = False  # Flag that we are done so we exit this loop
-                    pygame.quit()
-                    sys.exit()
-
-                # Switching screens based on which button the user clicks
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if demo_back_button.over_button(pos) is True:
-                        Demo = False
-                        homeScreen = True
-                        current_year = 1993
-
-                # Highlighting the buttons to light blue if motion is detected over the buttons
-                if event.type == pygame.MOUSEMOTION:
-                    if demo_back_button.over_button(pos) is True:
-                        demo_back_button.color = LIGHT_BLUE
-                    else:
-                        demo_back_button.color = LIGHT_GREY
-
-            # Increasing and decreasing water levels
-            water_height = 600
-            keys = pygame.key.get_pressed()
-            if 1993 < current_year < 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            if current_year == 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-
-            if current_year == 1993:
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            # Changing the year indicator
-            year_label = font.render(('Year: ' + str(current_year)), True, BLACK, LIGHT_GREY)
-            year_textRect = year_label.get_rect()
-            year_textRect.center = (540, 15)
-            display_surface.blit(year_label, year_textRect)
-
-            # Displaying male and female model
-            display_surface.blit(image, (100, 28))
-            display_surface.blit(female1, (100, 70))
-
-            year_string = str(current_year)
-
-            # Increment the scale based on number of years
-            scale_factor = (water_height - int(scale_human_data[year_string]))
-
-            # Display correct position of water
-            display_surface.blit(water, (0, scale_factor))
-
-            # Line at bottom
-            pygame.draw.line(display_surface, BLACK, (0, 800), (1000, 800), 3)
-
-            # Drawing human heights on screen
-            human_height_text = font.render('5\'9', True, BLACK)
-            human_height_text_rect = human_height_text.get_rect(center=(196, 14))
-            female_height_text = font.render('5\'3', True, BLACK)
-            female_height_text_rect = female_height_text.get_rect(center=(400, 76))
-            screen.blit(human_height_text, human_height_text_rect)
-            screen.blit(female_height_text, female_height_text_rect)
-
-            pygame.display.flip()
-
-            # Limit to 60 frames per second
-            clock.tick(15)
-
-        # Venice Simulation loop
-        while simulationVenice is True:
-            display_surface.fill(WHITE)
+        images = assets.load_scene('home')
+        dirty.mark_all()
+        selected_scene = None
+        while selected_scene is None:
+            shown_colors = [button.color for button in scene_buttons.values()]
 
             # Main event loop
             for event in pygame.event.get():  # User did something
                 pos = pygame.mouse.get_pos()
 
                 if event.type == pygame.QUIT:  # If user clicked close
-                    # simulationVenice = False  # Flag that we are done so we exit this loop
-                    pygame.quit()
-                    sys.exit()
-
-                # Switching screens based on which button the user clicks
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if venice_back_button.over_button(pos) is True:
-                        simulationVenice = False
-                        homeScreen = True
-                        current_year = 1993
-
-                # Highlighting the buttons to light blue if motion is detected over the buttons
-                if event.type == pygame.MOUSEMOTION:
-                    if venice_back_button.over_button(pos) is True:
-                        venice_back_button.color = LIGHT_BLUE
-                    else:
-                        venice_back_button.color = LIGHT_GREY
-
-            water_height = 535
-            display_surface.blit(venice, (-200, 0))
-            newyork_back_button.draw(display_surface)
-            keys = pygame.key.get_pressed()
-
-            # Increasing year indicator
-            if 1993 < current_year < 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            if current_year == 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-
-            if current_year == 1993:
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            # Code to change the years
-            year_label = font.render(('Year: ' + str(current_year)), True, BLACK, LIGHT_GREY)
-            year_textRect = year_label.get_rect()
-            year_textRect.center = (540, 15)
-            display_surface.blit(year_label, year_textRect)
-
-            year_string = str(current_year)
-
-            # Increment the scale based on number of years
-            scale_factor = (water_height - int(scale_venice_data[year_string]))
-
-            # Display correct position of water
-            display_surface.blit(real_ocean, (0, scale_factor))
-
-            venice_back_button.draw(display_surface)
-
-            # Updating everything we have drawn
-            pygame.display.flip()
-
-            # Limit to 60 frames per second
-            clock.tick(60)
+                    engine.quit()
 
-        # New york simulation loop
-        while simulationTwo is True:
-            display_surface.fill(WHITE)
-
-            # Main event loop
-            for event in pygame.event.get():  # User did something
-                pos = pygame.mouse.get_pos()
-
-                if event.type == pygame.QUIT:  # If user clicked close
-                    # simulationTwo = False  # Flag that we are done so we exit this loop
-                    pygame.quit()
-                    sys.exit()
+                # Starting or stopping the frame timer
+                if event.type == pygame.KEYDOWN and event.key == FRAME_TIMER_KEY:
+                    timer.toggle()
 
                 # Switching screens based on which button the user clicks
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if newyork_back_button.over_button(pos) is True:
-                        simulationTwo = False
-                        homeScreen = True
-                        current_year = 1993
+                    for name, button in scene_buttons.items():
+                        if button.over_button(pos) is True:
+                            selected_scene = name
 
                 # Highlighting the buttons to light blue if motion is detected over the buttons
                 if event.type == pygame.MOUSEMOTION:
-                    if newyork_back_button.over_button(pos) is True:
-                        newyork_back_button.color = LIGHT_BLUE
+                    hovered = [button for button in scene_buttons.values()
+                               if button.over_button(pos) is True]
+                    if hovered:
+                        hovered[0].color = LIGHT_BLUE
                     else:
-                        newyork_back_button.color = LIGHT_GREY
-
-            water_height = 532
-            display_surface.blit(new_york1, (0, 0))
-            newyork_back_button.draw(display_surface)
-            keys = pygame.key.get_pressed()
-
-            # Updating year indicator
-            if 1993 < current_year < 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.08)
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.08)
-
-            if current_year == 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.08)
-
-            if current_year == 1993:
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.08)
-
-            # Code to change the years
-            year_label = font.render(('Year: ' + str(current_year)), True, BLACK, LIGHT_GREY)
-            year_textRect = year_label.get_rect()
-            year_textRect.center = (540, 15)
-            display_surface.blit(year_label, year_textRect)
-
-            year_string = str(current_year)
-
-            # Increment the scale based on number of years
-            scale_factor = (water_height - int(scale_newyork_data[year_string]))
-
-            # Display correct position of water
-            display_surface.blit(real_ocean, (0, scale_factor))
-
-            if current_year == 2100:
-                title_text = font3.render(
-                    'This may not look like a significant change compared to the size', True, BLACK)
-                title_text_rect = title_text.get_rect(center=(SCREENWIDTH / 2, 50))
-                screen.blit(title_text, title_text_rect)
-                title_text2 = font3.render(
-                    'of the Statue of Liberty Island, but throughout time, as the water rises,',
-                    True, BLACK)
-                title_text_rect2 = title_text2.get_rect(center=(SCREENWIDTH / 2, 70))
-                screen.blit(title_text2, title_text_rect2)
-                title_text3 = font3.render(
-                    'the water will begin to seep into the concrete foundation and '
-                    'break it down, causing structural damage', True, BLACK)
-                title_text_rect3 = title_text3.get_rect(center=(SCREENWIDTH / 2, 90))
-                screen.blit(title_text3, title_text_rect3)
-
-            pygame.display.flip()
+                        for button in scene_buttons.values():
+                            button.color = LIGHT_GREY
+            timer.lap('events')
+
+            # Marking the buttons whose highlight changed
+            for button, shown_color in zip(scene_buttons.values(), shown_colors):
+                if button.color != shown_color:
+                    dirty.mark(button.rect())
+
+            # Converting the images decoded in the background since the last frame
+            assets.poll()
+            timer.lap('update')
+
+            # Drawing the parts of the screen that changed
+            for _ in dirty.regions(display_surface):
+                display_surface.blit(images['home_screen'], (0, 0))
+                for button in scene_buttons.values():
+                    button.draw(display_surface)
+                title_text = text_cache.render(font2, 'Sea Level Rise Simulator', BLACK)
+                title_text_rect = title_text.get_rect(center=(SCREENWIDTH / 2, 125))
+                display_surface.blit(title_text, title_text_rect)
+            timer.lap('blits')
+
+            # Updating the parts of the screen that were drawn
+            dirty.update()
+            timer.lap('flip')
 
             # Limit to 60 frames per second
             clock.tick(60)
+            timer.lap('tick')
+            timer.end_frame()
 
-        # Amsterdam Simulation Loop
-        while simulationThree is True:
-            display_surface.fill(WHITE)
-
-            # Main event loop
-            for event in pygame.event.get():  # User did something
-                pos = pygame.mouse.get_pos()
-
-                if event.type == pygame.QUIT:  # If user clicked close
-                    # simulationThree = False  # Flag that we are done so we exit this loop
-                    pygame.quit()
-                    sys.exit()
-
-                # Switching screens based on which button the user clicks
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if amsterdam_back_button.over_button(pos) is True:
-                        simulationThree = False
-                        homeScreen = True
-                        current_year = 1993
-
-                # Highlighting the buttons to light blue if motion is detected over the buttons
-                if event.type == pygame.MOUSEMOTION:
-                    if amsterdam_back_button.over_button(pos) is True:
-                        amsterdam_back_button.color = LIGHT_BLUE
-                    else:
-                        amsterdam_back_button.color = LIGHT_GREY
-            water_height = 525
-            display_surface.blit(amsterdam1, (0, 0))
-            amsterdam_back_button.draw(display_surface)
-
-            keys = pygame.key.get_pressed()
-            if 1993 < current_year < 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            if current_year == 2100:
-                if keys[pygame.K_LEFT]:
-                    current_year += -1
-                    time.sleep(0.1)
-
-            if current_year == 1993:
-                if keys[pygame.K_RIGHT]:
-                    current_year += 1
-                    time.sleep(0.1)
-
-            # Code to change the years
-            year_label = font.render(('Year: ' + str(current_year)), True, BLACK, LIGHT_GREY)
-            year_textRect = year_label.get_rect()
-            year_textRect.center = (540, 15)
-            display_surface.blit(year_label, year_textRect)
-
-            year_string = str(current_year)
-
-            # Increment the scale based on number of years
-            scale_factor = (water_height - int(scale_amsterdam_data[year_string]))
-
-            # Display correct position of water
-            display_surface.blit(real_ocean, (0, scale_factor))
-
-            pygame.display.flip()
-
-            # --- Limit to 60 frames per second
-            clock.tick(60)
+        # Running the selected scene until its back button is clicked
+        engine.run(SCENES[selected_scene], back_button)
 
 
 if __name__ == '__main__':
     run_simulation()
 
     python_ta.check_all(config={
-        'extra-imports': ['csv', 'Dict', 'List', 'pprint'],  # the names (strs) of imported modules
-        'allowed-io': ['read_csv'],  # the names (strs) of functions that call print/open/input
+        'extra-imports': ['pygame', 'computations', 'gmsl_cache', 'assets', 'text_cache',
+                          'dirty_rects', 'scenes', 'scene_engine', 'sea_level_series',
+                          'water_offsets', 'typing',
+                          'python_ta'],  # the names (strs) of imported modules
+        'allowed-io': [],  # the names (strs) of functions that call print/open/input
         'max-line-length': 100,
         'disable': ['R1705', 'C0200']
     })
@@ -0,0 +1,240 @@
+"""
+This file handles remembering the results of the computation stages of the program.
+
+Every stage result is keyed by a SHA-256 hash of the name of the stage, the code of its function
+and the contents of its inputs and parameters, so a stage is only computed again if something it
+depends on changed. Only the code of the stage function itself is hashed, so a change to a
+function it calls needs a new STAGE_FORMAT_VERSION.
+For example, changing the rate from 2080 to 2100 recomputes the predictions from 2081 and the
+stages after them, but not the yearly averages or the predictions until 2080.
+
+The most recently used results are kept in memory, up to a maximum number of results, and they
+can also be written to a cache directory, so that every run of the program can use them.
+
+Every call returns its own copy of a result, so a caller modifying it does not change the
+result kept in the cache or the ones returned to other callers. If the cache directory cannot be
+written to, the results are only kept in memory.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import struct
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from sea_level_series import SeaLevelSeries
+
+STAGE_DIRECTORY_NAME = 'stages'
+STAGE_FORMAT_VERSION = 2
+DEFAULT_MAX_ENTRIES = 64
+
+
+class StageCache:
+    """A cache of stage results keyed by the contents of their inputs.
+
+    Instance Attributes:
+        - max_entries: the number of results kept in memory, after which the least recently
+          used result is dropped
+        - cache_dir: the directory the results are also written to, or None to keep them only
+          in memory
+        - hits: the number of results of every stage that were found in the cache
+        - misses: the number of results of every stage that had to be computed
+
+    Representation Invariants:
+        - self.max_entries > 0
+    """
+    max_entries: int
+    cache_dir: Optional[str]
+    hits: Dict[str, int]
+    misses: Dict[str, int]
+    # Private Instance Attributes:
+    #   - _entries: the results kept in memory by their key, from the least to the most
+    #     recently used
+    _entries: OrderedDict
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 cache_dir: Optional[str] = None) -> None:
+        """Initialize a new, empty stage cache.
+
+        Preconditions:
+            - max_entries > 0
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = {}
+        self.misses = {}
+        self._entries = OrderedDict()
+
+    def run(self, stage: str, function: Callable[..., Any], *inputs: Any,
+            key: Optional[str] = None, **parameters: Any) -> Any:
+        """Return a copy of function(*inputs, **parameters), computing it only if the cache
+        has no result of the given stage for the same inputs and parameters.
+
+        If key is given, it identifies the contents of the inputs instead of their hash, such
+        as the hash of a file whose name is the input. The results of function are kept apart
+        from the results of other code, even for the same stage name.
+        """
+        if key is None:
+            key = content_hash(inputs)
+        key = content_hash((stage, STAGE_FORMAT_VERSION, stage_identity(function), key,
+                            parameters))
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+            return copy.deepcopy(self._entries[key])
+
+        found, result = self._read(key)
+        if found:
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+        else:
+            result = function(*inputs, **parameters)
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+            self._write(key, result)
+
+        self._entries[key] = result
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def clear(self) -> None:
+        """Forget every result kept in memory. The results in the cache directory are kept."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of results kept in memory."""
+        return len(self._entries)
+
+    def _path(self, key: str) -> str:
+        """Return the path of the cache file of the given key."""
+        return os.path.join(self.cache_dir, f'{key}.pickle')
+
+    def _read(self, key: str) -> tuple:
+        """Return whether the result of the given key is in the cache directory, and the
+        result if it is.
+        """
+        if self.cache_dir is None:
+            return False, None
+        try:
+            with open(self._path(key), 'rb') as file:
+                return True, pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False, None
+
+    def _write(self, key: str, result: Any) -> None:
+        """Write the given result to the cache directory, if the cache has one."""
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except OSError:
+            # the cache directory cannot be written to, so the result is only kept in memory
+            pass
+
+
+# The caches returned by default_cache, by their directory
+_DEFAULT_CACHES: Dict[str, StageCache] = {}
+
+
+def default_cache(cache_dir: str) -> StageCache:
+    """Return the stage cache of the program that writes its results to cache_dir, creating it
+    the first time, so every caller shares the results kept in memory.
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    if cache_dir not in _DEFAULT_CACHES:
+        _DEFAULT_CACHES[cache_dir] = StageCache(cache_dir=cache_dir)
+    return _DEFAULT_CACHES[cache_dir]
+
+
+def stage_identity(function: Callable[..., Any]) -> tuple:
+    """Return the module and the qualified name of function and the hash of its code, or None
+    instead of the hash if function has no code, like a built-in function.
+    """
+    code = getattr(function, '__code__', None)
+    return (getattr(function, '__module__', None),
+            getattr(function, '__qualname__', type(function).__qualname__),
+            None if code is None else _code_hash(code))
+
+
+def content_hash(value: Any) -> str:
+    """Return the SHA-256 hash of the contents of value.
+
+    Values of different types never have the same hash, even if they compare equal (1 and
+    1.0, or a list and a tuple). Dictionaries are hashed in order, since the order of their
+    keys is kept by the stages. Other objects are hashed by their class and attributes.
+    """
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def _update(digest: Any, value: Any) -> None:
+    """Add the type and the contents of value to the given hash."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        _add(digest, type(value).__name__.encode(), repr(value).encode())
+    elif isinstance(value, bytes):
+        _add(digest, b'bytes', value)
+    elif isinstance(value, (list, tuple)):
+        _add(digest, type(value).__name__.encode(), str(len(value)).encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        _add(digest, b'dict', str(len(value)).encode())
+        for item in value.items():
+            _update(digest, item)
+    elif isinstance(value, (np.ndarray, np.generic)):
+        array = np.ascontiguousarray(value)
+        _add(digest, b'ndarray', f'{array.dtype.str}{array.shape}'.encode(), array.tobytes())
+    elif isinstance(value, SeaLevelSeries):
+        _add(digest, b'SeaLevelSeries')
+        _update(digest, (value.times, value.values))
+    else:
+        _add(digest, type(value).__qualname__.encode())
+        _update(digest, dict(sorted(vars(value).items())))
+
+
+def _code_hash(code: types.CodeType) -> str:
+    """Return the SHA-256 hash of the bytecode of code, the names it uses and its constants,
+    including the code of the functions defined in it.
+    """
+    digest = hashlib.sha256()
+    _add(digest, code.co_code, ' '.join(code.co_names).encode())
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            _add(digest, b'code', _code_hash(constant).encode())
+        elif isinstance(constant, frozenset):
+            # the order of a set depends on the hash seed of the interpreter
+            _add(digest, b'frozenset', repr(sorted(constant, key=repr)).encode())
+        else:
+            _add(digest, type(constant).__name__.encode(), repr(constant).encode())
+    return digest.hexdigest()
+
+
+def _add(digest: Any, *parts: bytes) -> None:
+    """Add the given parts to the hash, each preceded by its length, so different sequences of
+    parts never give the same bytes.
+    """
+    for part in parts:
+        digest.update(struct.pack('<Q', len(part)))
+        digest.update(part)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['hashlib', 'os', 'pickle', 'struct', 'types', 'collections', 'typing',
+                          'numpy', 'sea_level_series'],
+        'allowed-io': ['_read', '_write'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
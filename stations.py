@@ -0,0 +1,196 @@
+"""
+This file handles reading the global mean sea level csv files of many stations at once.
+
+Every csv file in a directory is one station. The files are parsed in parallel worker
+processes with the block reader, and the stations are then aligned on a common time axis into
+a single array with a row per station and a column per time, where the times a station has no
+value for are NaN (or masked). The rows, the time range and the sampling step of every station
+are kept with the array.
+
+All the corresponding global mean sea level values are in mm.
+
+This file is Copyright (c) 2020 Yousuf Hassan, Aaditya Mandal, Faraz Hossein, and Dinkar Verma.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+import numpy as np
+from gmsl_reader import DEFAULT_BLOCK_SIZE, read_series
+from sea_level_series import SeaLevelSeries
+
+JOINS = ('outer', 'inner')
+
+
+class StationMetadata:
+    """The description of the csv file of one station.
+
+    Instance Attributes:
+        - name: the name of the station, which is the name of its file without the extension
+        - filename: the path of the csv file
+        - rows: the number of distinct times in the csv file
+        - first_time: the first time of the csv file, or NaN if it has no rows
+        - last_time: the last time of the csv file, or NaN if it has no rows
+        - step: the constant spacing between the times of the csv file, or None if the spacing
+          is irregular
+    """
+    name: str
+    filename: str
+    rows: int
+    first_time: float
+    last_time: float
+    step: Optional[float]
+
+    def __init__(self, name: str, filename: str, rows: int, first_time: float,
+                 last_time: float, step: Optional[float]) -> None:
+        """Initialize new station metadata with the specified parameters"""
+        self.name = name
+        self.filename = filename
+        self.rows = rows
+        self.first_time = first_time
+        self.last_time = last_time
+        self.step = step
+
+    def __repr__(self) -> str:
+        """Return a string representation of this station."""
+        return f'StationMetadata({self.name!r}, rows={self.rows}, ' \
+               f'first_time={self.first_time}, last_time={self.last_time})'
+
+
+class StationArray:
+    """The global mean sea levels of many stations on a common time axis.
+
+    Instance Attributes:
+        - times: float64 array of the common times, sorted in ascending order
+        - values: array of shape (len(stations), len(times)), where values[i][j] is the level
+          of stations[i] at times[j]; missing values are NaN, or masked if values is a masked
+          array
+        - stations: the metadata of every row of values
+
+    Representation Invariants:
+        - self.values.shape == (len(self.stations), len(self.times))
+    """
+    times: np.ndarray
+    values: np.ndarray
+    stations: List[StationMetadata]
+
+    def __init__(self, times: np.ndarray, values: np.ndarray,
+                 stations: List[StationMetadata]) -> None:
+        """Initialize a new station array with the specified parameters"""
+        self.times = times
+        self.values = values
+        self.stations = stations
+
+    def names(self) -> List[str]:
+        """Return the name of the station of every row."""
+        return [station.name for station in self.stations]
+
+    def station(self, name: str) -> SeaLevelSeries:
+        """Return the values of the given station on the common time axis, leaving out the
+        times it has no value for.
+
+        Raise a KeyError if there is no station with that name.
+        """
+        if name not in self.names():
+            raise KeyError(name)
+        row = np.ma.filled(self.values[self.names().index(name)], np.nan)
+        present = ~np.isnan(row)
+        return SeaLevelSeries(self.times[present], row[present])
+
+    def __len__(self) -> int:
+        """Return the number of stations."""
+        return len(self.stations)
+
+
+def read_stations(directory: str, pattern: str = '*.csv', join: str = 'outer',
+                  masked: bool = False, decimals: Optional[int] = None,
+                  workers: Optional[int] = None,
+                  block_size: int = DEFAULT_BLOCK_SIZE) -> StationArray:
+    """Return the stations of every csv file in directory whose name matches pattern, aligned
+    on a common time axis, with the stations sorted by file name.
+
+    With join='outer' the time axis holds every time of any station, and with join='inner'
+    only the times every station has. If decimals is given, the times are rounded to that many
+    decimals before aligning, so stations sampled at slightly different moments share columns;
+    if that gives a station the same time twice, the later row is kept, like read_csv.
+    Missing values are NaN, or masked if masked is True.
+
+    The files are parsed over workers processes (os.cpu_count() by default, and none if
+    workers == 1). Raise a ValueError naming the file if a file cannot be parsed.
+
+    Preconditions:
+        - join in JOINS
+    """
+    if join not in JOINS:
+        raise ValueError(f'unknown join {join!r}, expected one of {JOINS}')
+    filenames = sorted(glob.glob(os.path.join(directory, pattern)))
+    read = partial(_read_station, decimals=decimals, block_size=block_size)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(filenames)))
+    if workers == 1:
+        parsed = [read(filename) for filename in filenames]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(read, filenames))
+
+    times = align_times([station_times for station_times, _, _ in parsed], join)
+    values = np.full((len(parsed), len(times)), np.nan)
+    for row, (station_times, station_values, _) in zip(values, parsed):
+        columns = np.searchsorted(times, station_times)
+        found = columns < len(times)
+        found[found] = times[columns[found]] == station_times[found]
+        row[columns[found]] = station_values[found]
+
+    if masked:
+        values = np.ma.masked_invalid(values)
+    return StationArray(times, values, [metadata for _, _, metadata in parsed])
+
+
+def align_times(station_times: List[np.ndarray], join: str = 'outer') -> np.ndarray:
+    """Return the sorted common time axis of the given sorted station times: every time of any
+    station with join='outer', and the times of every station with join='inner'.
+    """
+    if not station_times:
+        return np.empty(0)
+    if join == 'inner':
+        times = station_times[0]
+        for other in station_times[1:]:
+            times = np.intersect1d(times, other, assume_unique=True)
+        return times
+    return np.unique(np.concatenate(station_times))
+
+
+def _read_station(filename: str, decimals: Optional[int], block_size: int) \
+        -> Tuple[np.ndarray, np.ndarray, StationMetadata]:
+    """Return the times and the values of the given station file, and its metadata."""
+    try:
+        series = read_series(filename, block_size)
+    except ValueError as error:
+        raise ValueError(f'{filename}: {error}') from None
+
+    times, values = series.times, series.values
+    if decimals is not None and len(times) > 0:
+        times = np.round(times, decimals)
+        # keep the last row of every rounded time
+        last = np.append(times[1:] != times[:-1], True)
+        times, values = times[last], values[last]
+
+    name = os.path.splitext(os.path.basename(filename))[0]
+    first_time, last_time = (float(times[0]), float(times[-1])) if len(times) > 0 \
+        else (float('nan'), float('nan'))
+    return times, values, StationMetadata(name, filename, len(times), first_time, last_time,
+                                          SeaLevelSeries(times, values).step)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['glob', 'os', 'concurrent.futures', 'functools', 'typing', 'numpy',
+                          'gmsl_reader', 'sea_level_series'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200', 'R0913']
+    })
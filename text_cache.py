@@ -0,0 +1,88 @@
+"""
+This file handles caching rendered text for the pygame simulation.
+
+Rendering text rasterizes every glyph, but almost every text drawn by the simulation (button
+names, titles, captions and the year labels) is the same from one frame to the next. The
+TextCache keeps the rendered surfaces keyed by font, text and colours, and drops the least
+recently used ones when it is full.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+import pygame
+
+DEFAULT_MAXSIZE = 256
+
+
+class TextCache:
+    """A least recently used cache of rendered text surfaces.
+
+    Instance Attributes:
+        - maxsize: the largest number of surfaces kept in the cache
+        - hits: the number of renders answered from the cache
+        - misses: the number of renders that rasterized the text
+
+    Representation Invariants:
+        - self.maxsize > 0
+    """
+    maxsize: int
+    hits: int
+    misses: int
+    # Private Instance Attributes:
+    #   - _surfaces: the rendered surfaces, from the least to the most recently used
+    _surfaces: 'OrderedDict[tuple, pygame.Surface]'
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        """Initialize a new empty text cache holding at most maxsize surfaces."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+               background: Optional[Tuple[int, int, int]] = None) -> pygame.Surface:
+        """Return text rendered (antialiased) with font in color on background, like
+        font.render(text, True, color, background), rendering it only if it is not cached.
+
+        The returned surface is shared, so it must not be drawn on.
+        """
+        key = (font, text, color, background)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color, background)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def prerender(self, font: pygame.font.Font, texts: Iterable[str],
+                  color: Tuple[int, int, int],
+                  background: Optional[Tuple[int, int, int]] = None) -> None:
+        """Render every text of texts into the cache ahead of time."""
+        for text in texts:
+            self.render(font, text, color, background)
+
+    def __len__(self) -> int:
+        """Return the number of surfaces in the cache."""
+        return len(self._surfaces)
+
+
+def year_text(year: int) -> str:
+    """Return the text of the year indicator for the given year."""
+    return 'Year: ' + str(year)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['collections', 'typing', 'pygame'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
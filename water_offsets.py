@@ -0,0 +1,143 @@
+"""
+This file contains the WaterOffsets class, the water positions of every scene in every year.
+
+The y coordinate of the top of the water of every scene is computed for every year at once from
+a yearly SeaLevelSeries, and kept in a single integer array with a row per scene and a column
+per year, so a scene looks up its water with year - start_year instead of formatting the year
+as a string and dividing the sea level every frame. The array is contiguous, so it is pickled
+as one buffer when it is sent to worker processes.
+
+A table can also have several columns per year (12 for months), so the water can be animated
+smoothly between years while every frame still only looks up one element. Where the measured
+samples of the csv file are given, the columns between whole years they cover are interpolated
+between the monthly averages of those samples, placed in the middle of their month; the other
+columns, such as the predicted years, are interpolated linearly between the yearly values. The
+columns of whole years always use the yearly values.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+from aggregation import aggregate
+from scenes import SCENES, Scene
+from sea_level_series import SeaLevelSeries
+
+
+class WaterOffsets:
+    """The y coordinate of the top of the water of every scene in every year.
+
+    Instance Attributes:
+        - start_year: the year of the first column of offsets
+        - scene_names: the name of the scene of every row of offsets
+        - steps_per_year: the number of columns of offsets per year
+        - offsets: int32 array with a row per scene, where offsets[i, j] is the top of the
+          water of scene_names[i] at the time start_year + j / steps_per_year
+
+    Representation Invariants:
+        - self.offsets.ndim == 2
+        - self.offsets.shape[0] == len(self.scene_names)
+        - self.steps_per_year >= 1
+    """
+    start_year: int
+    scene_names: List[str]
+    steps_per_year: int
+    offsets: np.ndarray
+    # Private Instance Attributes:
+    #   - _rows: the row of offsets of every scene, by name
+    _rows: Dict[str, int]
+
+    def __init__(self, start_year: int, scene_names: List[str], offsets: np.ndarray,
+                 steps_per_year: int = 1) -> None:
+        """Initialize a new table of water offsets.
+
+        Preconditions:
+            - offsets.shape[0] == len(scene_names)
+            - steps_per_year >= 1
+        """
+        self.start_year = start_year
+        self.scene_names = list(scene_names)
+        self.steps_per_year = steps_per_year
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int32)
+        self._rows = {name: i for i, name in enumerate(self.scene_names)}
+
+    @classmethod
+    def from_series(cls, series: SeaLevelSeries,
+                    scenes: Optional[Dict[str, Scene]] = None,
+                    steps_per_year: int = 1,
+                    measured: Optional[SeaLevelSeries] = None) -> 'WaterOffsets':
+        """Return the water offsets of the given scenes (every scene by default) for every year
+        of series, which must have one value per year, with steps_per_year offsets per year.
+
+        If steps_per_year > 1 and measured (the sub-annual samples series was averaged from,
+        such as the rows of the csv file) is given, the sea levels between the middle of its
+        first and its last month are interpolated between its monthly averages. The other sea
+        levels between two years are interpolated linearly between the yearly values of series.
+        The offsets of whole years are always the same as the ones returned by
+        Scene.water_offset for the values of series.
+
+        Preconditions:
+            - steps_per_year >= 1
+        """
+        if scenes is None:
+            scenes = SCENES
+        if (len(series) > 1 and series.step != 1.0) or \
+                (len(series) > 0 and series.times[0] != np.floor(series.times[0])):
+            raise ValueError('the series must have one value per whole year')
+
+        heights = np.array([scene.water_height for scene in scenes.values()], dtype=np.int64)
+        divisors = np.array([scene.divisor for scene in scenes.values()], dtype=np.float64)
+        levels = series.values
+        if steps_per_year > 1 and len(series) > 1:
+            steps = np.arange((len(series) - 1) * steps_per_year + 1)
+            # Whole years and months of the table are the same floats as the month bins
+            times = (series.times[0] * steps_per_year + steps) / steps_per_year
+            levels = np.interp(times, series.times, levels)
+
+            monthly = aggregate(measured, 'month', 'mean') if measured is not None else None
+            if monthly is not None and len(monthly) > 0:
+                # The average of a month is the level in the middle of the month
+                middles = monthly.times + 1 / 24
+                inside = (times >= middles[0]) & (times <= middles[-1])
+                levels[inside] = np.interp(times[inside], middles, monthly.values)
+
+            # Keeping the yearly values exact instead of recomputing them from the interpolation
+            levels[::steps_per_year] = series.values
+
+        # Dividing as floats and truncating towards zero, like int(sea_level / divisor)
+        rises = (levels[np.newaxis, :] / divisors[:, np.newaxis]).astype(np.int64)
+
+        start_year = int(series.times[0]) if len(series) > 0 else 0
+        return cls(start_year, list(scenes), heights[:, np.newaxis] - rises, steps_per_year)
+
+    def scene(self, name: str) -> np.ndarray:
+        """Return the offsets of the given scene, indexed by self.index(time).
+
+        Preconditions:
+            - name in self.scene_names
+        """
+        return self.offsets[self._rows[name]]
+
+    def index(self, time: float) -> int:
+        """Return the column of offsets closest to the given (decimal) year, clamped to the
+        first and the last column.
+        """
+        index = int(round((time - self.start_year) * self.steps_per_year))
+        return min(max(index, 0), self.offsets.shape[1] - 1)
+
+    def offset(self, name: str, time: float) -> int:
+        """Return the top of the water of the given scene at the given (decimal) year.
+
+        Preconditions:
+            - name in self.scene_names
+        """
+        return int(self.offsets[self._rows[name], self.index(time)])
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'extra-imports': ['typing', 'numpy', 'aggregation', 'scenes', 'sea_level_series'],
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })
@@ -0,0 +1,101 @@
+"""
+This file handles moving the year of a simulation scene while an arrow key is held.
+
+The year moves by one as soon as a key is pressed, and then once every repeat interval for as
+long as the key is held. The interval is measured in elapsed time, not in frames, so the year
+moves at the same speed at any frame rate and the frame loop never has to sleep. The interval
+can shrink with every repeat (down to a minimum) to speed up long presses.
+
+This file is Copyright (c) 2020 Aaditya Mandal, Faraz Hossein, Dinkar Verma, and Yousuf Hassan.
+"""
+
+
+class YearStepper:
+    """Moves a year between first_year and last_year based on the held arrow keys and the
+    time elapsed between frames.
+
+    Instance Attributes:
+        - first_year: the smallest year
+        - last_year: the largest year
+        - interval: the time between the first and the second step of a press, in ms
+        - acceleration: the factor the interval is multiplied by after every repeated step
+        - min_interval: the smallest interval, in ms
+
+    Representation Invariants:
+        - self.first_year <= self.last_year
+        - 0 < self.min_interval <= self.interval
+        - 0 < self.acceleration <= 1
+    """
+    first_year: int
+    last_year: int
+    interval: float
+    acceleration: float
+    min_interval: float
+    # Private Instance Attributes:
+    #   - _direction: the direction of the current press (-1, 0 or 1)
+    #   - _current_interval: the time between the steps of the current press, in ms
+    #   - _until_next: the time left until the next step of the current press, in ms
+    _direction: int
+    _current_interval: float
+    _until_next: float
+
+    def __init__(self, first_year: int, last_year: int, interval: float = 100.0,
+                 acceleration: float = 1.0, min_interval: float = 20.0) -> None:
+        """Initialize a new year stepper with the specified parameters
+
+        Preconditions:
+            - first_year <= last_year
+            - interval > 0
+            - 0 < acceleration <= 1
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.interval = interval
+        self.acceleration = acceleration
+        self.min_interval = min(min_interval, interval)
+        self.reset()
+
+    @property
+    def current_interval(self) -> float:
+        """The time between the steps of the current press, in ms."""
+        return self._current_interval
+
+    def reset(self) -> None:
+        """Forget the current press, so the next update starts a new one."""
+        self._direction = 0
+        self._current_interval = self.interval
+        self._until_next = 0.0
+
+    def update(self, year: int, elapsed_ms: float, left: bool, right: bool) -> int:
+        """Return the year after elapsed_ms milliseconds with the given arrow keys held.
+
+        A new press moves the year immediately, and a held key moves it again every time the
+        repeat interval has passed, several times in one call if a frame took longer than the
+        interval. Holding both keys, or neither, does not move the year.
+        """
+        direction = int(right) - int(left)
+        if direction == 0:
+            self.reset()
+            return year
+
+        if direction != self._direction:
+            self.reset()
+            self._direction = direction
+        else:
+            self._until_next -= elapsed_ms
+
+        while self._until_next <= 0:
+            year = min(max(year + direction, self.first_year), self.last_year)
+            self._until_next += self._current_interval
+            self._current_interval = max(self._current_interval * self.acceleration,
+                                         self.min_interval)
+
+        return year
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['R1705', 'C0200']
+    })